@@ -1,23 +1,45 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, abort
+from flask.json.provider import DefaultJSONProvider
 from flask_sqlalchemy import SQLAlchemy
 from flask_socketio import SocketIO
+from sqlalchemy import bindparam, delete, event, select, update, text
+from sqlalchemy.orm import joinedload
 from datetime import datetime
 from typing import Optional
 from pathlib import Path
 import os
 import json
-from scraper import StreamScraper
+import atexit
+import time
+import queue
 import logging
 import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from config_manager import get_config
-from database import get_media_db
-from gemini_client import GeminiClient
 from models import EpisodeVariant
-from language_guard import pick_best, sort_by_preference, pick_best_with_quality
+from language_guard import best_by_preference, sort_by_preference_with_best
+
+try:
+    import orjson
+except ImportError:  # orjson ist optional, sonst wird die Standardbibliothek verwendet
+    orjson = None
 
 # Get configuration
 config = get_config()
 
+
+@lru_cache(maxsize=256)
+def _cfg_lookup(version: int, key: str, default):
+    return config.get(key, default)
+
+
+def _cached_cfg(key: str, default=None):
+    """config.get mit Cache für den Request-Pfad; config.set() und config.save_later() erhöhen config.version und verwerfen ihn damit."""
+    return _cfg_lookup(config.version, key, default)
+
+
 # Konfiguriere Logging
 level_name = str(config.get('logging.level', 'DEBUG')).upper()
 logging_level = getattr(logging, level_name, logging.DEBUG)
@@ -30,12 +52,9 @@ logger = logging.getLogger(__name__)
 BASE_DIR = Path(__file__).resolve().parent
 
 app = Flask(__name__)
-streams_db_path = BASE_DIR / 'streams.db'
-app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{streams_db_path.as_posix()}'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['SECRET_KEY'] = 'streamscraper-secret-key'
-db = SQLAlchemy(app)
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode="threading")
+db = SQLAlchemy()
+socketio = SocketIO()
+_app_initialized = False
 
 
 current_progress = {
@@ -47,20 +66,88 @@ current_progress = {
 }
 _progress_lock = threading.Lock()
 
+# Fortschritts-Updates werden auf höchstens 5 pro Sekunde gedrosselt
+PROGRESS_EMIT_INTERVAL = 0.2
+_last_progress_emit = 0.0
+_trailing_progress_emit: Optional[threading.Timer] = None
+
+# Zuletzt an alle Clients gesendeter Stand, Basis für download_progress_delta
+_last_progress_sent: Optional[dict] = None
+# Zuletzt gesendeter Download-Status, Basis für status_update_delta
+_last_status_sent: Optional[dict] = None
+_progress_sent_lock = threading.Lock()
+
+# SQLite erlaubt nur eine begrenzte Anzahl gebundener Parameter pro Statement
+SQLITE_IN_CHUNK_SIZE = 500
+
 
 def _copy_progress() -> dict:
+    # current_progress enthält immer alle Schlüssel, eine flache Kopie genügt
     with _progress_lock:
-        return {
-            "progress": current_progress.get("progress", 0.0),
-            "speed": current_progress.get("speed"),
-            "eta": current_progress.get("eta"),
-            "message": current_progress.get("message", ""),
-            "series_name": current_progress.get("series_name"),
-        }
+        return dict(current_progress)
+
+
+def _broadcast_status_delta(download_status, sid: Optional[str] = None) -> None:
+    # Der volle Status geht nur beim Connect oder auf Anfrage raus; sonst nur geänderte Felder.
+    # "base" ist die Version, auf die das Delta aufsetzt; passt sie nicht, fordert der Client den vollen Status an
+    global _last_status_sent
+    version = getattr(download_status, "version", None)
+    # Gesendet wird unter dem Lock, damit Deltas in derselben Reihenfolge rausgehen, in der ihre Basis gesetzt wurde
+    with _progress_sent_lock:
+        previous = _last_status_sent
+        if previous is None or version is None or previous["v"] != version:
+            status = download_status.get_status()
+            _last_status_sent = {"v": version, "status": status}
+            if previous is not None:
+                patch = {key: value for key, value in status.items() if previous["status"].get(key) != value}
+                if patch:
+                    socketio.emit("status_update_delta", {"base": previous["v"], "v": version, "patch": patch})
+        if sid is not None:
+            socketio.emit("status_update", _last_status_sent["status"], _last_status_sent["v"], room=sid)
+
+
+def _broadcast_progress() -> None:
+    # Gesendet wird unter dem Lock: sonst könnten Timer und Download-Thread Deltas vertauschen,
+    # und ein so überholtes Feld bliebe bei den Clients veraltet, bis es sich erneut ändert
+    global _last_progress_sent
+    download_status = get_scraper().download_status
+    _broadcast_status_delta(download_status)
+
+    # Nur geänderte Felder verschicken; der volle Stand geht beim Connect und bei neuer Serie raus
+    with _progress_sent_lock:
+        # Den neuesten Stand erst hier lesen, damit ein später gesendetes Delta nie einen älteren Stand trägt
+        job = _copy_progress()
+        is_downloading = bool(getattr(download_status, "is_downloading", False))
+        previous = _last_progress_sent
+        _last_progress_sent = {"job": job, "is_downloading": is_downloading}
+
+        if previous is None or previous["job"].get("series_name") != job.get("series_name"):
+            socketio.emit("download_progress", {"job": job, "is_downloading": is_downloading})
+            return
+
+        delta = {}
+        changed = {key: value for key, value in job.items() if previous["job"].get(key) != value}
+        if changed:
+            delta["job"] = changed
+        if previous["is_downloading"] != is_downloading:
+            delta["is_downloading"] = is_downloading
+        if delta:
+            socketio.emit("download_progress_delta", delta)
+
+
+def _flush_progress() -> None:
+    global _trailing_progress_emit, _last_progress_emit
+    with _progress_lock:
+        _trailing_progress_emit = None
+        _last_progress_emit = time.monotonic()
+    _broadcast_progress()
 
 
 def _emit_progress(pct, speed, eta, msg):
+    global _trailing_progress_emit, _last_progress_emit
     with _progress_lock:
+        previous_message = current_progress["message"]
+
         if isinstance(pct, (int, float)):
             current_progress["progress"] = max(0.0, min(100.0, float(pct)))
 
@@ -83,11 +170,23 @@ def _emit_progress(pct, speed, eta, msg):
         if msg:
             current_progress["message"] = str(msg)
 
-    payload = {
-        "job": _copy_progress(),
-        "is_downloading": bool(getattr(scraper.download_status, "is_downloading", False)),
-    }
-    socketio.emit("download_progress", payload, broadcast=True)
+        # Zwischenstände zusammenfassen; Start/Ende und neue Meldungen gehen immer sofort raus
+        now = time.monotonic()
+        elapsed = now - _last_progress_emit
+        is_terminal = isinstance(pct, (int, float)) and pct in (0, 100)
+        if not is_terminal and current_progress["message"] == previous_message and elapsed < PROGRESS_EMIT_INTERVAL:
+            if _trailing_progress_emit is None:
+                _trailing_progress_emit = threading.Timer(PROGRESS_EMIT_INTERVAL - elapsed, _flush_progress)
+                _trailing_progress_emit.daemon = True
+                _trailing_progress_emit.start()
+            return
+
+        if _trailing_progress_emit is not None:
+            _trailing_progress_emit.cancel()
+            _trailing_progress_emit = None
+        _last_progress_emit = now
+
+    _broadcast_progress()
 
 
 def _prepare_progress(series_name: Optional[str] = None) -> None:
@@ -99,6 +198,163 @@ def _prepare_progress(series_name: Optional[str] = None) -> None:
         current_progress["message"] = ""
 
 
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _json_bytes(payload) -> bytes:
+    if orjson is not None:
+        # Nicht-String-Schlüssel (z. B. IDs) wie json.dumps in Strings umwandeln
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, default=_json_default, ensure_ascii=False).encode('utf-8')
+
+
+def json_response(payload, status: int = 200):
+    """JSON-Antwort über orjson (falls installiert); datetime-Werte werden als ISO-8601 ausgegeben."""
+    return app.response_class(_json_bytes(payload), status=status, mimetype='application/json')
+
+
+STREAM_JSON_BATCH_SIZE = 500
+_STREAM_END = object()
+
+
+def stream_json_list(key: str, items, **fields):
+    """
+    Streamt ein JSON-Objekt mit einer großen Liste, ohne die Liste vollständig im Speicher aufzubauen.
+
+    Ausgabe: {key: [...items], "count": Anzahl, **fields}. Die Einträge werden blockweise kodiert.
+    Der erste Eintrag wird schon vor dem Senden der Header geholt, damit Fehler beim Öffnen
+    der Quelle noch beim Aufrufer landen. Fehler während des Streamens werden geloggt und das
+    Objekt mit "status": "error" und "error" abgeschlossen, sodass die Antwort gültiges JSON bleibt.
+    """
+    iterator = iter(items)
+    first = next(iterator, _STREAM_END)
+
+    def generate():
+        yield b'{' + _json_bytes(key) + b':['
+        count = 0
+        chunk = []
+        tail = dict(fields)
+        try:
+            if first is not _STREAM_END:
+                chunk.append(_json_bytes(first))
+                count += 1
+            for item in iterator:
+                chunk.append(_json_bytes(item))
+                count += 1
+                if len(chunk) >= STREAM_JSON_BATCH_SIZE:
+                    yield (b',' if count > len(chunk) else b'') + b','.join(chunk)
+                    chunk = []
+            if chunk:
+                yield (b',' if count > len(chunk) else b'') + b','.join(chunk)
+        except Exception as exc:
+            count -= len(chunk)
+            logger.error(f"Fehler beim Streamen von '{key}' nach {count} gesendeten Einträgen: {exc}")
+            tail.update(status='error', error=str(exc))
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                close()
+        yield b'],"count":' + str(count).encode('ascii') + (b',' if tail else b'') + _json_bytes(tail)[1:]
+
+    return app.response_class(generate(), mimetype='application/json')
+
+
+class OrjsonJSONProvider(DefaultJSONProvider):
+    """
+    JSON-Provider für jsonify auf Basis von orjson.
+
+    Datums- und Sonderwerte laufen weiterhin über DefaultJSONProvider.default, die Ausgabe
+    bleibt damit identisch. Ohne orjson wird das Verhalten von Flask unverändert genutzt.
+    """
+
+    def _orjson_dumps(self, obj, sort_keys: bool, indent: bool) -> bytes:
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None:
+            return super().dumps(obj, **kwargs)
+        return self._orjson_dumps(
+            obj, kwargs.get('sort_keys', self.sort_keys), bool(kwargs.get('indent'))
+        ).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        """jsonify: die orjson-Bytes gehen direkt in die Response, ohne Umweg über str."""
+        if orjson is None:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        # Wie Flask: im Debug-Modus (bzw. compact=False) eingerückt ausgeben
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = self._orjson_dumps(obj, self.sort_keys, indent) + b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+
+app.json = OrjsonJSONProvider(app)
+
+
+def _static_error(message: str, status: int):
+    """
+    Fehlerantwort mit festem Text: Der JSON-Body wird einmal beim Import kodiert.
+
+    Pro Anfrage entsteht nur ein frisches Response-Objekt, da Flask Antworten nachträglich
+    verändern kann (z. B. Cookies) und sie deshalb nicht geteilt werden dürfen.
+    """
+    body = json.dumps({'status': 'error', 'error': message}, ensure_ascii=False).encode('utf-8')
+
+    def build():
+        return app.response_class(body, status=status, mimetype='application/json')
+
+    return build
+
+
+ERR_GEMINI_DISABLED = _static_error('Gemini API ist nicht aktiviert', 400)
+ERR_NO_DATA = _static_error('Keine Daten angegeben', 400)
+
+
+@app.errorhandler(400)
+@app.errorhandler(404)
+@app.errorhandler(413)
+def _api_http_error(error):
+    """Einheitliches JSON-Format für abort() in API-Routen; andere Routen behalten die Standardseite."""
+    if not request.path.startswith('/api/'):
+        return error
+    return json_response({'status': 'error', 'error': error.description}, status=error.code)
+
+
+# Einstellungen sind kleine JSON-Objekte; größere Bodies werden vor dem Parsen abgewiesen
+SETTINGS_MAX_BODY = 1 << 16
+
+
+@app.before_request
+def _limit_settings_body():
+    if request.path.startswith('/api/settings/') and (request.content_length or 0) > SETTINGS_MAX_BODY:
+        abort(413)
+
+
+def request_json() -> dict:
+    """
+    Lies den JSON-Body der Anfrage; leere oder ungültige Bodies ergeben {}.
+
+    get_json(silent=True) wirft nicht bei falschem Content-Type oder kaputtem JSON, dekodiert über
+    den orjson-Provider und cached das Ergebnis für weitere Zugriffe in derselben Anfrage.
+    """
+    payload = request.get_json(force=True, silent=True, cache=True)
+    return payload if isinstance(payload, dict) else {}
+
+
 def _as_bool(value):
     if isinstance(value, bool):
         return value
@@ -128,6 +384,11 @@ class Series(db.Model):
         cascade='all, delete-orphan'
     )
 
+    # Für Suchen mit Typfilter
+    __table_args__ = (
+        db.Index('ix_series_type_title', 'type', 'title'),
+    )
+
 class Episode(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     series_id = db.Column(db.Integer, db.ForeignKey('series.id'), nullable=False)
@@ -151,6 +412,11 @@ class Library(db.Model):
         cascade='all, delete-orphan'
     )
 
+    # Höchstens eine Standardbibliothek (partieller Unique-Index in SQLite)
+    __table_args__ = (
+        db.Index('uq_library_default', 'is_default', unique=True, sqlite_where=db.text('is_default = 1')),
+    )
+
 
 class SeriesLibrary(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -163,38 +429,83 @@ class SeriesLibrary(db.Model):
 
 
 def library_to_dict(library: Library) -> dict:
+    # Zeitstempel bleiben datetime-Objekte und werden erst von json_response serialisiert
     return {
         'id': library.id,
         'name': library.name,
         'path': library.path,
         'is_default': library.is_default,
-        'created_at': library.created_at.isoformat() if library.created_at else None,
-        'updated_at': library.updated_at.isoformat() if library.updated_at else None,
+        'created_at': library.created_at,
+        'updated_at': library.updated_at,
     }
 
 
+_libraries_cache: Optional[list] = None
+
+
+def get_cached_libraries() -> list:
+    """Liefert die nach Namen sortierten Bibliotheken aus dem In-Memory-Cache."""
+    global _libraries_cache
+    libraries = _libraries_cache
+    if libraries is None:
+        libraries = [library_to_dict(library) for library in Library.query.order_by(Library.name.asc()).all()]
+        _libraries_cache = libraries
+    return libraries
+
+
 def persist_libraries_to_config() -> None:
+    global _libraries_cache
     try:
         libraries = Library.query.order_by(Library.id).all()
-        config.config.setdefault('libraries', [])
-        config.config['libraries'] = [
-            {
-                'id': library.id,
-                'name': library.name,
-                'path': library.path,
-                'is_default': library.is_default,
-            }
-            for library in libraries
-        ]
-        config.save()
+        with config.lock:
+            config.config['libraries'] = [
+                {
+                    'id': library.id,
+                    'name': library.name,
+                    'path': library.path,
+                    'is_default': library.is_default,
+                }
+                for library in libraries
+            ]
+        _libraries_cache = None
+
+        # Schreiben übernimmt der Hintergrund-Writer, damit schnelle Änderungen nur einmal gespeichert werden
+        config.save_later()
     except Exception as exc:
         logger.error(f"Fehler beim Speichern der Bibliotheken in der Konfiguration: {exc}")
 
 
 def sync_libraries_from_config() -> None:
     libraries_cfg = config.get('libraries', []) or []
+    if not libraries_cfg and get_default_library():
+        return
+
     updated = False
 
+    # Nur der erste als Standard markierte Eintrag zählt; andere Standards vorab in einem Statement zurücksetzen
+    default_path = next(
+        (str(entry.get('path', '')).strip() for entry in libraries_cfg if entry.get('is_default')),
+        None
+    )
+    if default_path:
+        result = db.session.execute(
+            update(Library)
+            .where(Library.is_default.is_(True), Library.path != default_path)
+            .values(is_default=False)
+        )
+        updated = result.rowcount > 0
+
+    # Alle betroffenen Bibliotheken mit einer Abfrage laden
+    cfg_paths = [
+        str(entry.get('path', '')).strip()
+        for entry in libraries_cfg
+        if isinstance(entry, dict) and str(entry.get('path', '')).strip()
+    ]
+    existing = {
+        library.path: library
+        for library in Library.query.filter(Library.path.in_(cfg_paths)).all()
+    } if cfg_paths else {}
+
     for entry in libraries_cfg:
         try:
             name = str(entry.get('name', '')).strip()
@@ -202,8 +513,8 @@ def sync_libraries_from_config() -> None:
             if not name or not path:
                 continue
 
-            is_default = bool(entry.get('is_default', False))
-            library = Library.query.filter_by(path=path).first()
+            is_default = bool(default_path) and path == default_path
+            library = existing.get(path)
 
             if library:
                 if library.name != name or library.is_default != is_default:
@@ -218,6 +529,7 @@ def sync_libraries_from_config() -> None:
                     is_default=is_default
                 )
                 db.session.add(library)
+                existing[path] = library
                 updated = True
         except Exception as exc:
             logger.warning(f"Konnte Bibliothek aus Konfiguration nicht laden: {entry} ({exc})")
@@ -240,16 +552,121 @@ def get_default_library() -> Optional[Library]:
     return Library.query.filter_by(is_default=True).first()
 
 
+# Volltextindex für die Seriensuche (SQLite FTS5), synchron gehalten über Trigger
+SERIES_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS series_fts USING fts5(title, content='series', content_rowid='id')",
+    """CREATE TRIGGER IF NOT EXISTS series_fts_ai AFTER INSERT ON series BEGIN
+        INSERT INTO series_fts(rowid, title) VALUES (new.id, new.title);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS series_fts_ad AFTER DELETE ON series BEGIN
+        INSERT INTO series_fts(series_fts, rowid, title) VALUES ('delete', old.id, old.title);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS series_fts_au AFTER UPDATE OF title ON series BEGIN
+        INSERT INTO series_fts(series_fts, rowid, title) VALUES ('delete', old.id, old.title);
+        INSERT INTO series_fts(rowid, title) VALUES (new.id, new.title);
+    END""",
+)
+
+_series_fts_available = False
+
+
+def ensure_series_fts() -> None:
+    """Lege den FTS5-Index für Serientitel an und befülle ihn beim ersten Mal."""
+    global _series_fts_available
+    try:
+        with db.engine.begin() as conn:
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'series_fts'")
+            ).first()
+            for statement in SERIES_FTS_DDL:
+                conn.execute(text(statement))
+            if not exists:
+                conn.execute(text("INSERT INTO series_fts(series_fts) VALUES ('rebuild')"))
+        _series_fts_available = True
+    except Exception as exc:
+        _series_fts_available = False
+        logger.warning(f"FTS5-Suchindex nicht verfügbar, verwende LIKE-Suche: {exc}")
+
+
+def _fts_match_query(query: str) -> str:
+    # Jedes Wort als Präfix-Suche; Anführungszeichen verhindern FTS-Syntaxfehler durch Benutzereingaben
+    return ' '.join('"{}"*'.format(token.replace('"', '""')) for token in query.split())
+
+
+def _escape_like(value: str) -> str:
+    # %, _ und \ aus Benutzereingaben wörtlich suchen
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+# LIKE-Fallback einmal aufbauen; SQLite vergleicht ASCII bei LIKE ohnehin ohne Groß-/Kleinschreibung
+_SERIES_LIKE_STMT = select(Series.id, Series.title, Series.url, Series.type).where(
+    Series.title.like(bindparam('pattern'), escape='\\')
+)
+_SERIES_LIKE_TYPE_STMT = _SERIES_LIKE_STMT.where(Series.type == bindparam('type'))
+
+
+_SERIES_FTS_SELECT = (
+    "SELECT series.id, series.title, series.url, series.type "
+    "FROM series JOIN series_fts ON series.id = series_fts.rowid "
+    "WHERE series_fts MATCH :match"
+)
+_SERIES_FTS_STMT = text(_SERIES_FTS_SELECT + " ORDER BY series_fts.rank")
+_SERIES_FTS_TYPE_STMT = text(_SERIES_FTS_SELECT + " AND series.type = :type ORDER BY series_fts.rank")
+
+
+def search_series(query: str, series_type: str = 'all') -> list:
+    """Sucht Serien nach Titel und liefert die Treffer als Dicts mit id, title, url und type."""
+    # Nur die Spalten der Trefferliste laden, ohne ORM-Objekte aufzubauen
+    params = {}
+    if series_type != 'all':
+        params['type'] = series_type
+
+    if _series_fts_available:
+        params['match'] = _fts_match_query(query)
+        stmt = _SERIES_FTS_STMT if series_type == 'all' else _SERIES_FTS_TYPE_STMT
+        try:
+            return [dict(row) for row in db.session.execute(stmt, params).mappings()]
+        except Exception as exc:
+            db.session.rollback()
+            logger.warning(f"FTS-Suche fehlgeschlagen, verwende LIKE-Suche: {exc}")
+        del params['match']
+
+    params['pattern'] = f"%{_escape_like(query)}%"
+    stmt = _SERIES_LIKE_STMT if series_type == 'all' else _SERIES_LIKE_TYPE_STMT
+    return [dict(row) for row in db.session.execute(stmt, params).mappings()]
+
+
+def load_series_with_library(series_id: int) -> Optional[Series]:
+    # Serie, Zuordnung und Bibliothek in einer einzigen Abfrage laden
+    return db.session.execute(
+        select(Series)
+        .options(joinedload(Series.library_assignment).joinedload(SeriesLibrary.library))
+        .where(Series.id == series_id)
+    ).unique().scalar_one_or_none()
+
+
+@lru_cache(maxsize=1024)
+def _cached_content_type(url: str) -> str:
+    return get_scraper()._get_content_type(url)
+
+
+@lru_cache(maxsize=1024)
+def _cached_directory_name(series_name: str) -> str:
+    return get_scraper()._sanitize_directory_name(series_name)
+
+
 def determine_series_target_path(url: str, series_id: Optional[int] = None, library_id: Optional[int] = None) -> tuple[Optional[Library], Optional[str]]:
     library: Optional[Library] = None
+    series: Optional[Series] = None
 
     if library_id:
-        library = Library.query.get(library_id)
+        library = db.session.get(Library, library_id)
 
-    if not library and series_id:
-        assignment = SeriesLibrary.query.filter_by(series_id=series_id).first()
-        if assignment:
-            library = assignment.library
+    if series_id:
+        series = load_series_with_library(series_id)
+
+    if not library and series and series.library_assignment:
+        library = series.library_assignment.library
 
     if not library:
         library = get_default_library()
@@ -257,20 +674,17 @@ def determine_series_target_path(url: str, series_id: Optional[int] = None, libr
     if not library:
         return None, None
 
-    series: Optional[Series] = None
     series_name: Optional[str] = None
     content_dir: Optional[str] = None
 
-    if series_id:
-        series = Series.query.get(series_id)
-        if series:
-            series_name = series.title
-            if series.type:
-                content_dir = 'Animes' if series.type.lower() == 'anime' else 'Serien'
+    if series:
+        series_name = series.title
+        if series.type:
+            content_dir = 'Animes' if series.type.lower() == 'anime' else 'Serien'
 
     if not content_dir:
         try:
-            content_dir = scraper._get_content_type(url)
+            content_dir = _cached_content_type(url)
         except Exception:
             content_dir = None
 
@@ -283,32 +697,267 @@ def determine_series_target_path(url: str, series_id: Optional[int] = None, libr
     os.makedirs(base_path, exist_ok=True)
 
     if series_name:
-        sanitized_name = scraper._sanitize_directory_name(series_name)
+        sanitized_name = _cached_directory_name(series_name)
         target_path = os.path.join(base_path, sanitized_name)
         os.makedirs(target_path, exist_ok=True)
         return library, target_path
 
     return library, None
 
-# Erstelle die Datenbank
-with app.app_context():
-    db.create_all()
-    sync_libraries_from_config()
+# Schwere Komponenten (Scraper, Media-Datenbank, Gemini) werden erst bei der ersten Verwendung geladen
+_scraper = None
+_variant_scraper = None
+_media_db = None
+_gemini_client = None
+_gemini_client_settings = None
+_components_lock = threading.Lock()
+
+
+def get_scraper():
+    """Liefert die gemeinsame StreamScraper-Instanz und importiert das Modul beim ersten Aufruf."""
+    global _scraper
+    if _scraper is None:
+        with _components_lock:
+            if _scraper is None:
+                from scraper import StreamScraper
+                _scraper = StreamScraper(
+                    download_dir=config.get('download.directory'),
+                    max_parallel_downloads=config.get('download.max_parallel_downloads'),
+                    max_parallel_extractions=config.get('download.max_parallel_extractions'),
+                    socketio=socketio
+                )
+    return _scraper
 
-# Initialisiere die Media-Datenbank
-media_db = get_media_db(config.get('download.db_path', 'media.db'))
 
-# Initialisiere den Scraper
-scraper = StreamScraper(
-    download_dir=config.get('download.directory'),
-    max_parallel_downloads=config.get('download.max_parallel_downloads'),
-    max_parallel_extractions=config.get('download.max_parallel_extractions'),
-    socketio=socketio
-)
+def get_variant_scraper():
+    """
+    Liefert den gemeinsamen StreamScraper für die Varianten-Endpoints.
+
+    Er ist getrennt vom Download-Scraper, damit dessen Status unberührt bleibt, wird aber über
+    alle Anfragen wiederverwendet, sodass die HTTP-Session (Keep-Alive, TLS) erhalten bleibt.
+    """
+    global _variant_scraper
+    if _variant_scraper is None:
+        with _components_lock:
+            if _variant_scraper is None:
+                from scraper import StreamScraper
+                # extract_stream_urls teilt keinen veränderlichen Zustand, parallele Anfragen sind unkritisch
+                _variant_scraper = StreamScraper(
+                    download_dir=config.get('download.directory', 'downloads'),
+                    max_parallel_downloads=_as_int(config.get('download.max_parallel_downloads')) or 1,
+                    max_parallel_extractions=_as_int(config.get('download.max_parallel_extractions')) or 3
+                )
+    return _variant_scraper
+
+
+def get_media_database():
+    """Liefert die Media-Datenbank und importiert das Modul beim ersten Aufruf."""
+    global _media_db
+    if _media_db is None:
+        with _components_lock:
+            if _media_db is None:
+                from database import get_media_db
+                _media_db = get_media_db(config.get('download.db_path', 'media.db'))
+    return _media_db
+
+
+# Antworten der lesenden Medien-Endpunkte (Statistik, Suche) werden kurz zwischengespeichert
+READ_CACHE_TTL = 60.0
+READ_CACHE_MAX_ENTRIES = 128
+_read_cache: dict = {}
+_read_cache_lock = threading.Lock()
+
+
+def cached_read(key, loader):
+    """Liefert das Ergebnis von loader() aus dem TTL-Cache; das Ergebnis darf nicht verändert werden."""
+    now = time.monotonic()
+    with _read_cache_lock:
+        entry = _read_cache.get(key)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+    value = loader()
+    with _read_cache_lock:
+        if len(_read_cache) >= READ_CACHE_MAX_ENTRIES:
+            _read_cache.clear()
+        _read_cache[key] = (now + READ_CACHE_TTL, value)
+    return value
+
+
+def invalidate_read_cache() -> None:
+    """Verwirft alle zwischengespeicherten Antworten; nach jedem Schreibzugriff auf Medien oder Serien aufrufen."""
+    with _read_cache_lock:
+        _read_cache.clear()
+
+
+def get_gemini_client():
+    """Liefert den Gemini-Client passend zur aktuellen Konfiguration oder None, wenn deaktiviert."""
+    global _gemini_client, _gemini_client_settings
+    settings = (
+        _cached_cfg('gemini.enabled', False),
+        _cached_cfg('gemini.api_key', ''),
+        _cached_cfg('gemini.model', 'gemini-1.5-pro-latest'),
+    )
+    enabled, api_key, model = settings
+    if not (enabled and api_key):
+        return None
+
+    with _components_lock:
+        if _gemini_client is None or _gemini_client_settings != settings:
+            from gemini_client import GeminiClient
+            _gemini_client = GeminiClient(api_key=api_key, model=model)
+            _gemini_client_settings = settings
+            logger.info(f"Gemini API Client initialisiert mit Modell: {model}")
+        return _gemini_client
+
+
+def _register_shutdown_hook(func) -> None:
+    # Die (nicht-daemonischen) Worker eines ThreadPoolExecutor werden beim Beenden des Interpreters
+    # gejoint, bevor atexit-Hooks laufen; ein Abbruch muss sich daher in denselben früheren Hook einreihen
+    register = getattr(threading, "_register_atexit", None)
+    if register is None:
+        atexit.register(func)
+    else:
+        register(func)
+
+
+# Downloads (Serien und direkte VOE-Links) teilen sich einen kleinen, festen Pool.
+# Beide Routen lehnen einen zweiten Download ab, solange einer läuft; die Parallelität
+# pro Episode (download.max_parallel_downloads) regelt der Scraper selbst
+DOWNLOAD_POOL_SIZE = 2
+_download_pool = ThreadPoolExecutor(max_workers=DOWNLOAD_POOL_SIZE, thread_name_prefix="download")
+
+
+def _stop_downloads() -> None:
+    # Laufenden Download beim Beenden abbrechen, statt auf die restlichen Episoden der Serie zu warten
+    if _scraper is not None:
+        _scraper.download_status.request_cancel()
+    _download_pool.shutdown(wait=False, cancel_futures=True)
+
+
+_register_shutdown_hook(_stop_downloads)
+
+
+def _run_series_download(url: str, series_path: Optional[str]) -> None:
+    # Fehler im Pool würden sonst still im Future verschwinden
+    try:
+        get_scraper().start_download(url, series_path=series_path, progress_cb=_emit_progress)
+    except Exception as e:
+        logger.error(f"Fehler beim Download: {str(e)}", exc_info=True)
+
+
+# Hintergrundarbeit für Gemini-Anfragen läuft in einem festen Pool statt in einem Thread pro Request
+ENHANCE_POOL_SIZE = 4
+ENHANCE_COMMIT_BATCH_SIZE = 100
+# Spätestens nach so vielen Sekunden werden gesammelte Ergebnisse geschrieben, auch wenn der Stapel nicht voll ist
+ENHANCE_COMMIT_INTERVAL = 30.0
+
+_enhance_pool = ThreadPoolExecutor(max_workers=ENHANCE_POOL_SIZE, thread_name_prefix="enhance")
+# Wird beim Beenden gesetzt; laufende Verbesserungen schreiben dann ihre Ergebnisse und hören auf
+_enhance_stop = threading.Event()
+
+
+def _stop_enhancements() -> None:
+    _enhance_stop.set()
+    _enhance_pool.shutdown(wait=False, cancel_futures=True)
+
+
+_register_shutdown_hook(_stop_enhancements)
+
+
+def _gemini_max_concurrency() -> int:
+    # Wie die übrigen Einstellungen live gelesen, damit Änderungen ohne Neustart greifen
+    return max(1, _as_int(_cached_cfg('gemini.max_concurrency', 2)) or 2)
+
+
+def _gemini_requests_per_second() -> float:
+    try:
+        return max(0.1, float(_cached_cfg('gemini.requests_per_second', 1.0)))
+    except (TypeError, ValueError):
+        return 1.0
+
+
+class _ConcurrencyLimit:
+    """Begrenzt gleichzeitige Aufrufe wie ein Semaphore; das Limit wird bei jedem Eintritt neu gelesen."""
+
+    def __init__(self, limit):
+        self._limit = limit
+        self._active = 0
+        self._cond = threading.Condition()
+
+    def __enter__(self):
+        with self._cond:
+            # Mit Timeout, damit ein erhöhtes Limit auch ohne freiwerdenden Platz greift
+            while self._active >= self._limit():
+                self._cond.wait(timeout=1.0)
+            self._active += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        with self._cond:
+            self._active -= 1
+            self._cond.notify()
+
+
+_gemini_concurrency = _ConcurrencyLimit(_gemini_max_concurrency)
+
+
+class _TokenBucket:
+    """Einfacher Token-Bucket zur Begrenzung der Anfragerate."""
+
+    def __init__(self, rate, capacity: int = 1):
+        # rate: Anfragen pro Sekunde als Callable, damit Änderungen der Konfiguration sofort greifen
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                rate = self.rate()
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / rate
+            time.sleep(wait)
+
+
+_gemini_rate_limiter = _TokenBucket(_gemini_requests_per_second)
+
+
+# Laufende Verbesserungen je ('media' | 'episode', ID); doppelte Klicks starten keine zweite Anfrage
+_enhance_in_flight: set = set()
+_enhance_in_flight_lock = threading.Lock()
+
+
+def claim_enhancement(key: tuple) -> bool:
+    """Markiert eine Verbesserung als laufend. False, wenn für diesen Eintrag bereits eine läuft."""
+    with _enhance_in_flight_lock:
+        if key in _enhance_in_flight:
+            return False
+        _enhance_in_flight.add(key)
+        return True
+
+
+def release_enhancement(key: tuple) -> None:
+    with _enhance_in_flight_lock:
+        _enhance_in_flight.discard(key)
+
+
+def call_gemini(func, *args, **kwargs):
+    """Führt einen Gemini-Aufruf mit begrenzter Parallelität und Anfragerate aus."""
+    with _gemini_concurrency:
+        _gemini_rate_limiter.acquire()
+        return func(*args, **kwargs)
 
 
 def _current_status_payload() -> dict:
-    is_downloading = bool(scraper.download_status.is_downloading)
+    is_downloading = bool(get_scraper().download_status.is_downloading)
     return {
         "active": _copy_progress() if is_downloading else None,
         "queue": [],
@@ -317,34 +966,82 @@ def _current_status_payload() -> dict:
     }
 
 
-# Initialisiere den Gemini Client, wenn aktiviert
-gemini_enabled = config.get('gemini.enabled', False)
-gemini_api_key = config.get('gemini.api_key', '')
-gemini_model = config.get('gemini.model', 'gemini-1.5-pro-latest')
-gemini_client = None
+# Verzeichnis-Scans laufen nacheinander in einem einzigen Worker; die Warteschlange ist begrenzt
+SCAN_QUEUE_SIZE = 4
 
-if gemini_enabled and gemini_api_key:
-    gemini_client = GeminiClient(api_key=gemini_api_key, model=gemini_model)
-    logger.info(f"Gemini API Client initialisiert mit Modell: {gemini_model}")
-else:
-    logger.info("Gemini API Client nicht aktiviert")
+_scan_queue: "queue.Queue[str]" = queue.Queue(maxsize=SCAN_QUEUE_SIZE)
+_scan_pending: set = set()
+_scan_lock = threading.Lock()
+_scan_cancel = threading.Event()
+_scan_worker = None
 
-# Scanne das Download-Verzeichnis beim Start, wenn in der Konfiguration aktiviert
-if config.get('download.scan_on_startup', False):
-    download_dir = config.get('download.directory', 'downloads')
-    logger.info(f"Scanne Download-Verzeichnis: {download_dir}")
 
-    # Starte den Scan in einem separaten Thread, um den Serverstart nicht zu blockieren
-    def scan_directory():
+def _scan_worker_loop() -> None:
+    while True:
+        scan_dir = _scan_queue.get()
+        with _scan_lock:
+            _scan_pending.discard(scan_dir)
+        _scan_cancel.clear()
         try:
-            media_count, season_count, episode_count = media_db.scan_directory(download_dir)
+            media_count, season_count, episode_count = get_media_database().scan_directory(
+                scan_dir,
+                cancel_event=_scan_cancel,
+                parallelism=_as_int(_cached_cfg('scan.parallelism', 4)) or 4,
+                sort_by_inode=_as_bool(_cached_cfg('scan.sort_by_inode', False)),
+            )
             logger.info(f"Scan abgeschlossen: {media_count} Serien/Animes, {season_count} Staffeln, {episode_count} Episoden gefunden")
         except Exception as e:
             logger.error(f"Fehler beim Scannen des Verzeichnisses: {str(e)}")
+        finally:
+            invalidate_read_cache()
+            _scan_queue.task_done()
+
 
-    scan_thread = threading.Thread(target=scan_directory)
-    scan_thread.daemon = True
-    scan_thread.start()
+def enqueue_scan(scan_dir: str) -> bool:
+    """
+    Reihe einen Verzeichnis-Scan ein. Bereits wartende Scans desselben Verzeichnisses werden zusammengefasst.
+
+    Returns:
+        bool: False, wenn die Warteschlange voll ist
+    """
+    global _scan_worker
+    with _scan_lock:
+        if scan_dir in _scan_pending:
+            return True
+
+        if _scan_worker is None:
+            # Über SocketIO starten, damit der Worker zum konfigurierten async_mode passt
+            _scan_worker = socketio.start_background_task(_scan_worker_loop)
+
+        try:
+            _scan_queue.put_nowait(scan_dir)
+        except queue.Full:
+            return False
+        _scan_pending.add(scan_dir)
+    return True
+
+
+def cancel_scans() -> None:
+    """Bricht den laufenden Scan ab und verwirft wartende Scans."""
+    with _scan_lock:
+        while True:
+            try:
+                _scan_queue.get_nowait()
+            except queue.Empty:
+                break
+            _scan_queue.task_done()
+        _scan_pending.clear()
+    _scan_cancel.set()
+
+
+def start_startup_scan() -> None:
+    """Scanne das Download-Verzeichnis beim Start, wenn in der Konfiguration aktiviert."""
+    if not _cached_cfg('download.scan_on_startup', False):
+        return
+
+    download_dir = _cached_cfg('download.directory', 'downloads')
+    logger.info(f"Scanne Download-Verzeichnis: {download_dir}")
+    enqueue_scan(download_dir)
 
 @app.route('/')
 def index():
@@ -353,10 +1050,10 @@ def index():
 @app.route('/gemini')
 def gemini_settings():
     return render_template('gemini_settings.html',
-                           gemini_enabled=config.get('gemini.enabled', False),
-                           gemini_api_key=config.get('gemini.api_key', ''),
-                           gemini_model=config.get('gemini.model', 'gemini-1.5-pro-latest'),
-                           auto_enhance_metadata=config.get('gemini.auto_enhance_metadata', False))
+                           gemini_enabled=_cached_cfg('gemini.enabled', False),
+                           gemini_api_key=_cached_cfg('gemini.api_key', ''),
+                           gemini_model=_cached_cfg('gemini.model', 'gemini-1.5-pro-latest'),
+                           auto_enhance_metadata=_cached_cfg('gemini.auto_enhance_metadata', False))
 
 @app.route('/search')
 def search():
@@ -367,51 +1064,46 @@ def search():
         return jsonify([])
 
     # Suche in der Datenbank
-    query = f"%{query}%"
-    if series_type == 'all':
-        results = Series.query.filter(Series.title.ilike(query)).all()
-    else:
-        results = Series.query.filter(Series.title.ilike(query), Series.type == series_type).all()
-
-    return jsonify([{
-        'id': s.id,
-        'title': s.title,
-        'url': s.url,
-        'type': s.type
-    } for s in results])
+    return json_response(cached_read(('search', series_type, query), lambda: search_series(query, series_type)))
 
 @app.route('/api/scrape/list', methods=['POST'])
 def scrape_list():
     """Scrapt die Liste aller verfügbaren Serien/Animes"""
-    series_type = request.json.get('type')
+    series_type = request_json().get('type')
     logger.info(f"🔍 Starte Scraping für Typ: {series_type}")
 
     try:
         if series_type == 'anime':
             logger.info("🎌 Hole Anime-Liste von aniworld.to...")
-            items = scraper.get_anime_list()
+            items = get_scraper().get_anime_list()
         else:
             logger.info("📺 Hole Serien-Liste von s.to...")
-            items = scraper.get_series_list()
+            items = get_scraper().get_series_list()
 
         logger.info(f"✅ Scraping abgeschlossen: {len(items)} {series_type}s gefunden")
 
-        # Speichere in Datenbank
+        # Speichere in Datenbank: vorhandene URLs blockweise laden statt pro Eintrag abzufragen
+        urls = list(dict.fromkeys(item['url'] for item in items))
+        existing_urls = set()
+        for start in range(0, len(urls), SQLITE_IN_CHUNK_SIZE):
+            chunk = urls[start:start + SQLITE_IN_CHUNK_SIZE]
+            existing_urls.update(db.session.execute(select(Series.url).where(Series.url.in_(chunk))).scalars())
+
+        new_rows = []
         for item in items:
-            existing = Series.query.filter_by(url=item['url']).first()
-            if not existing:
-                series = Series(
-                    title=item['title'],
-                    url=item['url'],
-                    type=item['type']
-                )
-                db.session.add(series)
+            if item['url'] in existing_urls:
+                continue
+            existing_urls.add(item['url'])
+            new_rows.append({'title': item['title'], 'url': item['url'], 'type': item['type']})
 
+        if new_rows:
+            db.session.bulk_insert_mappings(Series, new_rows)
         db.session.commit()
+        invalidate_read_cache()
         logger.debug("Datenbank erfolgreich aktualisiert")
         
         # 👈 WICHTIG: Items zurückgeben!
-        return jsonify({'status': 'success', 'count': len(items), 'items': items})
+        return json_response({'status': 'success', 'count': len(items), 'items': items})
 
     except Exception as e:
         logger.error(f"Fehler beim Scraping: {str(e)}", exc_info=True)
@@ -420,7 +1112,7 @@ def scrape_list():
 @app.route('/api/download', methods=['POST'])
 def start_download():
     """Startet den Download einer Serie"""
-    data = request.json or {}
+    data = request_json()
     url = data.get('url')
     if not url:
         return jsonify({'error': 'URL ist erforderlich'}), 400
@@ -433,7 +1125,7 @@ def start_download():
         if library:
             logger.info(f"Verwende Bibliothek '{library.name}' für den Download")
 
-        if scraper.download_status.is_downloading:
+        if get_scraper().download_status.is_downloading:
             logger.warning("Es läuft bereits ein Download")
             return jsonify({'error': 'Es läuft bereits ein Download!'}), 409
 
@@ -445,15 +1137,9 @@ def start_download():
 
         _prepare_progress(series_name)
 
-        thread = threading.Thread(
-            target=scraper.start_download,
-            args=(url,),
-            kwargs={'series_path': series_path, 'progress_cb': _emit_progress}
-        )
-        thread.daemon = True
-        thread.start()
+        _download_pool.submit(_run_series_download, url, series_path)
 
-        return jsonify({
+        return json_response({
             'status': 'success',
             'library': library_to_dict(library) if library else None
         })
@@ -474,7 +1160,7 @@ def api_downloads_status():
 def download():
     """Starte einen Download."""
     try:
-        data = request.json or {}
+        data = request_json()
         url = data.get('url')
         logger.debug(f"Download-Anfrage erhalten für URL: {url}")
 
@@ -495,23 +1181,17 @@ def download():
                 series_name = series_obj.title
 
         # Prüfe ob bereits ein Download läuft
-        if scraper.download_status.is_downloading:
+        if get_scraper().download_status.is_downloading:
             logger.warning("Es läuft bereits ein Download")
             return jsonify({'error': 'Es läuft bereits ein Download!'}), 409
 
         _prepare_progress(series_name)
 
         # Starte Download im Hintergrund
-        logger.info(f"Starte Download-Thread für URL: {url}")
-        thread = threading.Thread(
-            target=scraper.start_download,
-            args=(url,),
-            kwargs={'series_path': series_path, 'progress_cb': _emit_progress}
-        )
-        thread.daemon = True
-        thread.start()
+        logger.info(f"Starte Download für URL: {url}")
+        _download_pool.submit(_run_series_download, url, series_path)
 
-        return jsonify({
+        return json_response({
             'message': 'Download gestartet',
             'library': library_to_dict(library) if library else None
         })
@@ -523,17 +1203,16 @@ def download():
 @app.route('/api/download/status')
 def download_status():
     """Hole den aktuellen Download-Status"""
-    status = scraper.download_status.get_status()
+    status = get_scraper().download_status.get_status()
     return jsonify(status)
 
 
 @app.get('/api/libraries')
 def list_libraries():
     try:
-        libraries = Library.query.order_by(Library.name.asc()).all()
-        return jsonify({
+        return json_response({
             'status': 'success',
-            'libraries': [library_to_dict(library) for library in libraries]
+            'libraries': get_cached_libraries()
         })
     except Exception as exc:
         logger.error(f"Fehler beim Laden der Bibliotheken: {exc}")
@@ -542,7 +1221,7 @@ def list_libraries():
 
 @app.post('/api/libraries')
 def add_library():
-    data = request.json or {}
+    data = request_json()
     name = str(data.get('name', '')).strip()
     path = str(data.get('path', '')).strip()
     is_default = bool(data.get('is_default', False))
@@ -554,8 +1233,9 @@ def add_library():
         os.makedirs(path, exist_ok=True)
 
         if is_default:
-            for library in Library.query.filter(Library.is_default.is_(True)).all():
-                library.is_default = False
+            db.session.execute(
+                update(Library).where(Library.is_default.is_(True)).values(is_default=False)
+            )
 
         library = Library(name=name, path=path, is_default=is_default)
         db.session.add(library)
@@ -563,7 +1243,7 @@ def add_library():
 
         persist_libraries_to_config()
 
-        return jsonify({'status': 'success', 'library': library_to_dict(library)}), 201
+        return json_response({'status': 'success', 'library': library_to_dict(library)}, status=201)
     except Exception as exc:
         logger.error(f"Fehler beim Anlegen der Bibliothek: {exc}")
         db.session.rollback()
@@ -572,7 +1252,7 @@ def add_library():
 
 @app.put('/api/libraries/<int:lib_id>')
 def update_library(lib_id: int):
-    data = request.json or {}
+    data = request_json()
     library = Library.query.get_or_404(lib_id)
 
     try:
@@ -591,16 +1271,18 @@ def update_library(lib_id: int):
 
         if 'is_default' in data:
             is_default = bool(data.get('is_default'))
-            library.is_default = is_default
             if is_default:
-                for other in Library.query.filter(Library.id != library.id).all():
-                    if other.is_default:
-                        other.is_default = False
+                db.session.execute(
+                    update(Library)
+                    .where(Library.is_default.is_(True), Library.id != library.id)
+                    .values(is_default=False)
+                )
+            library.is_default = is_default
 
         db.session.commit()
         persist_libraries_to_config()
 
-        return jsonify({'status': 'success', 'library': library_to_dict(library)})
+        return json_response({'status': 'success', 'library': library_to_dict(library)})
     except Exception as exc:
         logger.error(f"Fehler beim Aktualisieren der Bibliothek: {exc}")
         db.session.rollback()
@@ -609,32 +1291,31 @@ def update_library(lib_id: int):
 
 @app.delete('/api/libraries/<int:lib_id>')
 def delete_library(lib_id: int):
-    library = Library.query.get_or_404(lib_id)
+    was_default = db.session.execute(
+        select(Library.is_default).where(Library.id == lib_id)
+    ).scalar_one_or_none()
+    if was_default is None:
+        abort(404)
 
     try:
-        fallback_library = Library.query.filter(Library.id != library.id).first()
+        fallback_id = db.session.execute(
+            select(Library.id).where(Library.id != lib_id).order_by(Library.id).limit(1)
+        ).scalar_one_or_none()
+
+        # Zuordnungen, Löschung und neuer Standard in einer Transaktion
+        if fallback_id is not None:
+            db.session.execute(
+                update(SeriesLibrary).where(SeriesLibrary.library_id == lib_id).values(library_id=fallback_id)
+            )
+        else:
+            db.session.execute(delete(SeriesLibrary).where(SeriesLibrary.library_id == lib_id))
 
-        assignments = SeriesLibrary.query.filter_by(library_id=library.id).all()
-        if assignments:
-            if fallback_library:
-                for assignment in assignments:
-                    assignment.library_id = fallback_library.id
-            else:
-                for assignment in assignments:
-                    db.session.delete(assignment)
+        db.session.execute(delete(Library).where(Library.id == lib_id))
 
-        was_default = library.is_default
-        db.session.delete(library)
-        db.session.commit()
+        if was_default and fallback_id is not None:
+            db.session.execute(update(Library).where(Library.id == fallback_id).values(is_default=True))
 
-        if was_default and fallback_library:
-            fallback_library.is_default = True
-            db.session.commit()
-        elif was_default and not Library.query.filter_by(is_default=True).first():
-            new_default = Library.query.first()
-            if new_default:
-                new_default.is_default = True
-                db.session.commit()
+        db.session.commit()
 
         persist_libraries_to_config()
 
@@ -647,36 +1328,40 @@ def delete_library(lib_id: int):
 
 @app.get('/api/series/<int:series_id>')
 def get_series_detail(series_id: int):
-    series = Series.query.get_or_404(series_id)
-    assignment = SeriesLibrary.query.filter_by(series_id=series.id).first()
+    series = load_series_with_library(series_id)
+    if not series:
+        abort(404)
+    assignment = series.library_assignment
     library = assignment.library if assignment else None
 
-    return jsonify({
+    return json_response({
         'status': 'success',
         'series': {
             'id': series.id,
             'title': series.title,
             'url': series.url,
             'type': series.type,
-            'created_at': series.created_at.isoformat() if series.created_at else None,
+            'created_at': series.created_at,
             'library': library_to_dict(library) if library else None
         },
-        'libraries': [library_to_dict(item) for item in Library.query.order_by(Library.name.asc()).all()]
+        'libraries': get_cached_libraries()
     })
 
 
 @app.post('/api/series/<int:series_id>/assign_library')
 def assign_series_library(series_id: int):
-    data = request.json or {}
+    data = request_json()
     library_id = data.get('library_id')
     if not library_id:
         return jsonify({'status': 'error', 'error': 'library_id ist erforderlich'}), 400
 
-    series = Series.query.get_or_404(series_id)
+    series = load_series_with_library(series_id)
+    if not series:
+        abort(404)
     library = Library.query.get_or_404(library_id)
 
     try:
-        assignment = SeriesLibrary.query.filter_by(series_id=series.id).first()
+        assignment = series.library_assignment
         if assignment:
             assignment.library_id = library.id
         else:
@@ -684,7 +1369,7 @@ def assign_series_library(series_id: int):
             db.session.add(assignment)
 
         db.session.commit()
-        return jsonify({
+        return json_response({
             'status': 'success',
             'series': {
                 'id': series.id,
@@ -702,12 +1387,8 @@ def assign_series_library(series_id: int):
 def get_media_list():
     """Hole die Liste aller Serien und Animes aus der Datenbank."""
     try:
-        media_list = media_db.get_all_media()
-        return jsonify({
-            'status': 'success',
-            'count': len(media_list),
-            'media': media_list
-        })
+        # Große Kataloge zeilenweise aus SQLite streamen statt als komplette Liste aufzubauen
+        return stream_json_list('media', get_media_database().iter_all_media(), status='success')
     except Exception as e:
         logger.error(f"Fehler beim Abrufen der Medienliste: {str(e)}")
         return jsonify({
@@ -719,12 +1400,10 @@ def get_media_list():
 def get_media_details(media_id):
     """Hole detaillierte Informationen zu einer Serie/einem Anime."""
     try:
+        media_db = get_media_database()
+
         # Hole die Serie/den Anime
-        media = None
-        for m in media_db.get_all_media():
-            if m['id'] == media_id:
-                media = m
-                break
+        media = media_db.get_media_by_id(media_id)
 
         if not media:
             return jsonify({
@@ -735,11 +1414,12 @@ def get_media_details(media_id):
         # Hole die Staffeln
         seasons = media_db.get_seasons_by_media_id(media_id)
 
-        # Hole die Episoden für jede Staffel
+        # Hole die Episoden aller Staffeln in einer Abfrage
+        episodes_by_season = media_db.get_episodes_for_seasons([season['id'] for season in seasons])
         for season in seasons:
-            season['episodes'] = media_db.get_episodes_by_season_id(season['id'])
+            season['episodes'] = episodes_by_season.get(season['id'], [])
 
-        return jsonify({
+        return json_response({
             'status': 'success',
             'media': media,
             'seasons': seasons
@@ -754,19 +1434,20 @@ def get_media_details(media_id):
 @app.route('/api/media/stats')
 def get_media_stats():
     """Hole Statistiken über die Mediendatenbank."""
-    try:
-        media_list = media_db.get_all_media()
-        episode_count = media_db.get_episode_count()
-        total_size = media_db.get_total_size()
+    def load():
+        stats = get_media_database().get_media_stats()
+        type_counts = stats['type_counts']
+        episode_count = stats['episode_count']
+        total_size = stats['total_size']
 
-        # Berechne die Anzahl der Serien und Animes
-        series_count = sum(1 for media in media_list if media['type'] == 'series')
-        anime_count = sum(1 for media in media_list if media['type'] == 'anime')
+        # Anzahl der Serien und Animes direkt aus der Aggregation
+        series_count = type_counts.get('series', 0)
+        anime_count = type_counts.get('anime', 0)
 
-        return jsonify({
+        return {
             'status': 'success',
             'stats': {
-                'total_media': len(media_list),
+                'total_media': sum(type_counts.values()),
                 'series_count': series_count,
                 'anime_count': anime_count,
                 'episode_count': episode_count,
@@ -774,7 +1455,10 @@ def get_media_stats():
                 'total_size_mb': round(total_size / (1024 * 1024), 2),
                 'total_size_gb': round(total_size / (1024 * 1024 * 1024), 2)
             }
-        })
+        }
+
+    try:
+        return json_response(cached_read('media_stats', load))
     except Exception as e:
         logger.error(f"Fehler beim Abrufen der Medienstatistiken: {str(e)}")
         return jsonify({
@@ -786,7 +1470,7 @@ def get_media_stats():
 def reset_session():
     """Reset die Session für neue Downloads."""
     try:
-        if scraper.reset_session():
+        if get_scraper().reset_session():
             return jsonify({'message': 'Session zurückgesetzt'}), 200
         else:
             return jsonify({'error': 'Fehler beim Zurücksetzen der Session'}), 500
@@ -798,16 +1482,17 @@ def reset_session():
 def api_cancel():
     """Bricht den aktuellen Download ab."""
     try:
-        if not getattr(scraper.download_status, "is_downloading", False):
+        download_status = get_scraper().download_status
+        if not getattr(download_status, "is_downloading", False):
             logger.warning("Kein aktiver Download zum Abbrechen")
             return jsonify({"ok": False, "message": "Kein aktiver Download"}), 409
 
         cancelled = False
-        cancel_callable = getattr(scraper.download_status, "request_cancel", None)
+        cancel_callable = getattr(download_status, "request_cancel", None)
         if callable(cancel_callable):
             cancelled = bool(cancel_callable())
-        elif hasattr(scraper.download_status, "cancel_requested"):
-            scraper.download_status.cancel_requested = True
+        elif hasattr(download_status, "cancel_requested"):
+            download_status.cancel_requested = True
             cancelled = True
 
         if cancelled:
@@ -828,26 +1513,21 @@ def manage_download_dir():
         # Gib das aktuelle Download-Verzeichnis zurück
         return jsonify({
             'status': 'success',
-            'download_dir': config.get('download.directory', 'downloads')
+            'download_dir': _cached_cfg('download.directory', 'downloads')
         })
     elif request.method == 'POST':
         try:
-            data = request.json
+            data = request_json()
 
             # Wenn nur ein Scan angefordert wird
             if data and data.get('scan_only', False):
-                download_dir = config.get('download.directory', 'downloads')
-
-                def scan_directory_thread():
-                    try:
-                        media_count, season_count, episode_count = media_db.scan_directory(download_dir)
-                        logger.info(f"Scan abgeschlossen: {media_count} Serien/Animes, {season_count} Staffeln, {episode_count} Episoden gefunden")
-                    except Exception as e:
-                        logger.error(f"Fehler beim Scannen des Verzeichnisses: {str(e)}")
+                download_dir = _cached_cfg('download.directory', 'downloads')
 
-                scan_thread = threading.Thread(target=scan_directory_thread)
-                scan_thread.daemon = True
-                scan_thread.start()
+                if not enqueue_scan(download_dir):
+                    return jsonify({
+                        'status': 'error',
+                        'error': 'Zu viele Scans in der Warteschlange'
+                    }), 429
 
                 return jsonify({
                     'status': 'success',
@@ -863,39 +1543,29 @@ def manage_download_dir():
 
             new_dir = data['download_dir']
 
-            # Prüfe, ob das Verzeichnis existiert
-            if not os.path.exists(new_dir):
-                try:
-                    # Versuche, das Verzeichnis zu erstellen
-                    os.makedirs(new_dir, exist_ok=True)
-                    logger.info(f"Verzeichnis erstellt: {new_dir}")
-                except Exception as e:
-                    return jsonify({
-                        'status': 'error',
-                        'error': f"Fehler beim Erstellen des Verzeichnisses: {str(e)}"
-                    }), 500
+            # Lege das Verzeichnis an (existiert es schon, passiert nichts)
+            try:
+                os.makedirs(new_dir, exist_ok=True)
+                logger.info(f"Verzeichnis angelegt oder bereits vorhanden: {new_dir}")
+            except Exception as e:
+                return jsonify({
+                    'status': 'error',
+                    'error': f"Fehler beim Erstellen des Verzeichnisses: {str(e)}"
+                }), 500
 
             # Aktualisiere die Konfiguration
-            config.config['download']['directory'] = new_dir
+            with config.lock:
+                config.config['download']['directory'] = new_dir
 
-            # Speichere die Konfiguration
-            with open('config.json', 'w') as f:
-                json.dump(config.config, f, indent=4)
+            # Speichere die Konfiguration (gebündelt im Hintergrund)
+            config.save_later()
 
             # Aktualisiere den Scraper
-            scraper.download_dir = new_dir
+            get_scraper().download_dir = new_dir
 
             # Scanne das neue Verzeichnis
-            def scan_new_directory():
-                try:
-                    media_count, season_count, episode_count = media_db.scan_directory(new_dir)
-                    logger.info(f"Scan abgeschlossen: {media_count} Serien/Animes, {season_count} Staffeln, {episode_count} Episoden gefunden")
-                except Exception as e:
-                    logger.error(f"Fehler beim Scannen des Verzeichnisses: {str(e)}")
-
-            scan_thread = threading.Thread(target=scan_new_directory)
-            scan_thread.daemon = True
-            scan_thread.start()
+            if not enqueue_scan(new_dir):
+                logger.warning(f"Scan von {new_dir} nicht eingereiht: Warteschlange voll")
 
             return jsonify({
                 'status': 'success',
@@ -909,6 +1579,15 @@ def manage_download_dir():
                 'error': str(e)
             }), 500
 
+@app.post('/api/media/scan/cancel')
+def cancel_media_scan():
+    """Bricht laufende und wartende Verzeichnis-Scans ab."""
+    cancel_scans()
+    return jsonify({
+        'status': 'success',
+        'message': 'Scan-Abbruch angefordert'
+    })
+
 @app.route('/api/settings/gemini', methods=['GET', 'POST'])
 def manage_gemini_settings():
     """Verwaltet die Gemini API-Einstellungen."""
@@ -916,44 +1595,35 @@ def manage_gemini_settings():
         # Gib die aktuellen Gemini-Einstellungen zurück
         return jsonify({
             'status': 'success',
-            'enabled': config.get('gemini.enabled', False),
-            'api_key': config.get('gemini.api_key', ''),
-            'model': config.get('gemini.model', 'gemini-1.5-pro-latest'),
-            'auto_enhance_metadata': config.get('gemini.auto_enhance_metadata', False)
+            'enabled': _cached_cfg('gemini.enabled', False),
+            'api_key': _cached_cfg('gemini.api_key', ''),
+            'model': _cached_cfg('gemini.model', 'gemini-1.5-pro-latest'),
+            'auto_enhance_metadata': _cached_cfg('gemini.auto_enhance_metadata', False)
         })
     elif request.method == 'POST':
         try:
-            data = request.json
+            data = request_json()
 
             if not data:
-                return jsonify({
-                    'status': 'error',
-                    'error': 'Keine Daten angegeben'
-                }), 400
+                return ERR_NO_DATA()
 
             # Aktualisiere die Konfiguration
-            if 'gemini' not in config.config:
-                config.config['gemini'] = {}
-
-            config.config['gemini']['enabled'] = data.get('enabled', False)
-            config.config['gemini']['api_key'] = data.get('api_key', '')
-            config.config['gemini']['model'] = data.get('model', 'gemini-1.5-pro-latest')
-            config.config['gemini']['auto_enhance_metadata'] = data.get('auto_enhance_metadata', False)
-
-            # Speichere die Konfiguration
-            with open('config.json', 'w') as f:
-                json.dump(config.config, f, indent=4)
-
-            # Aktualisiere den Gemini-Client
-            global gemini_client
-            if config.config['gemini']['enabled'] and config.config['gemini']['api_key']:
-                gemini_client = GeminiClient(
-                    api_key=config.config['gemini']['api_key'],
-                    model=config.config['gemini']['model']
-                )
+            with config.lock:
+                if 'gemini' not in config.config:
+                    config.config['gemini'] = {}
+
+                config.config['gemini']['enabled'] = data.get('enabled', False)
+                config.config['gemini']['api_key'] = data.get('api_key', '')
+                config.config['gemini']['model'] = data.get('model', 'gemini-1.5-pro-latest')
+                config.config['gemini']['auto_enhance_metadata'] = data.get('auto_enhance_metadata', False)
+
+            # Speichere die Konfiguration (gebündelt im Hintergrund)
+            config.save_later()
+
+            # Der Gemini-Client wird beim nächsten Zugriff mit den neuen Einstellungen erstellt
+            if get_gemini_client():
                 logger.info(f"Gemini API Client aktualisiert mit Modell: {config.config['gemini']['model']}")
             else:
-                gemini_client = None
                 logger.info("Gemini API Client deaktiviert")
 
             return jsonify({
@@ -971,14 +1641,10 @@ def manage_gemini_settings():
 def clear_media_database():
     """Löscht alle Einträge aus der Mediendatenbank."""
     try:
-        # Lösche die Datenbank-Datei und erstelle eine neue
-        db_path = config.get('download.db_path', 'media.db')
-        if os.path.exists(db_path):
-            os.remove(db_path)
-
-        # Initialisiere die Datenbank neu
-        global media_db
-        media_db = get_media_db(db_path)
+        # Laufende Scans abbrechen und alle Einträge transaktional löschen
+        cancel_scans()
+        get_media_database().clear_all()
+        invalidate_read_cache()
 
         return jsonify({
             'status': 'success',
@@ -996,41 +1662,50 @@ def clear_media_database():
 @app.route('/api/media/enhance/<int:media_id>', methods=['POST'])
 def enhance_media_metadata(media_id):
     """Verbessert die Metadaten einer Serie/eines Animes mit Hilfe der Gemini API."""
+    gemini_client = get_gemini_client()
     if not gemini_client:
-        return jsonify({
-            'status': 'error',
-            'error': 'Gemini API ist nicht aktiviert'
-        }), 400
+        return ERR_GEMINI_DISABLED()
 
     try:
         # Hole die Medieninformationen aus der Datenbank
-        media = media_db.get_media_by_id(media_id)
+        media = get_media_database().get_media_by_id(media_id)
         if not media:
             return jsonify({
                 'status': 'error',
                 'error': f'Keine Medien mit ID {media_id} gefunden'
             }), 404
 
-        # Starte die Metadaten-Verbesserung in einem separaten Thread
+        in_flight_key = ('media', media_id)
+        if not claim_enhancement(in_flight_key):
+            return jsonify({
+                'status': 'busy',
+                'message': f"Metadaten-Verbesserung für '{media['title']}' läuft bereits"
+            }), 409
+
+        # Starte die Metadaten-Verbesserung im Hintergrund-Pool
         def enhance_metadata_thread():
             try:
                 # Verbessere die Metadaten mit Gemini
-                enhanced_metadata = gemini_client.enhance_series_metadata(media['title'])
+                enhanced_metadata = call_gemini(gemini_client.enhance_series_metadata, media['title'])
 
                 # Aktualisiere die Datenbank
                 if enhanced_metadata:
-                    success = media_db.update_media_metadata(media_id, enhanced_metadata)
+                    success = get_media_database().update_media_metadata(media_id, enhanced_metadata)
+                    invalidate_read_cache()
                     if success:
                         logger.info(f"Metadaten für '{media['title']}' erfolgreich verbessert")
                     else:
                         logger.error(f"Fehler beim Aktualisieren der Metadaten für '{media['title']}'")
             except Exception as e:
                 logger.error(f"Fehler bei der Metadaten-Verbesserung: {str(e)}")
+            finally:
+                release_enhancement(in_flight_key)
 
-        # Starte den Thread
-        thread = threading.Thread(target=enhance_metadata_thread)
-        thread.daemon = True
-        thread.start()
+        try:
+            _enhance_pool.submit(enhance_metadata_thread)
+        except Exception:
+            release_enhancement(in_flight_key)
+            raise
 
         return jsonify({
             'status': 'success',
@@ -1046,15 +1721,13 @@ def enhance_media_metadata(media_id):
 @app.route('/api/episode/enhance/<int:episode_id>', methods=['POST'])
 def enhance_episode_metadata(episode_id):
     """Verbessert die Metadaten einer Episode mit Hilfe der Gemini API."""
+    gemini_client = get_gemini_client()
     if not gemini_client:
-        return jsonify({
-            'status': 'error',
-            'error': 'Gemini API ist nicht aktiviert'
-        }), 400
+        return ERR_GEMINI_DISABLED()
 
     try:
         # Hole die Episodeninformationen aus der Datenbank
-        episode = media_db.get_episode_by_id(episode_id)
+        episode = get_media_database().get_episode_by_id(episode_id)
         if not episode:
             return jsonify({
                 'status': 'error',
@@ -1062,7 +1735,7 @@ def enhance_episode_metadata(episode_id):
             }), 404
 
         # Hole die Staffelinformationen
-        season = media_db.get_season_by_id(episode['season_id'])
+        season = get_media_database().get_season_by_id(episode['season_id'])
         if not season:
             return jsonify({
                 'status': 'error',
@@ -1070,18 +1743,26 @@ def enhance_episode_metadata(episode_id):
             }), 404
 
         # Hole die Medieninformationen
-        media = media_db.get_media_by_id(season['media_id'])
+        media = get_media_database().get_media_by_id(season['media_id'])
         if not media:
             return jsonify({
                 'status': 'error',
                 'error': f'Keine Medien mit ID {season["media_id"]} gefunden'
             }), 404
 
-        # Starte die Metadaten-Verbesserung in einem separaten Thread
+        in_flight_key = ('episode', episode_id)
+        if not claim_enhancement(in_flight_key):
+            return jsonify({
+                'status': 'busy',
+                'message': f"Metadaten-Verbesserung für Episode {season['season_number']}x{episode['episode_number']} läuft bereits"
+            }), 409
+
+        # Starte die Metadaten-Verbesserung im Hintergrund-Pool
         def enhance_episode_thread():
             try:
                 # Verbessere die Metadaten mit Gemini
-                enhanced_metadata = gemini_client.analyze_episode_content(
+                enhanced_metadata = call_gemini(
+                    gemini_client.analyze_episode_content,
                     series_title=media['title'],
                     episode_title=episode['title'] or f"Episode {episode['episode_number']}",
                     season_num=season['season_number'],
@@ -1090,18 +1771,21 @@ def enhance_episode_metadata(episode_id):
 
                 # Aktualisiere die Datenbank
                 if enhanced_metadata:
-                    success = media_db.update_episode_metadata(episode_id, enhanced_metadata)
+                    success = get_media_database().update_episode_metadata(episode_id, enhanced_metadata)
                     if success:
                         logger.info(f"Metadaten für Episode {season['season_number']}x{episode['episode_number']} erfolgreich verbessert")
                     else:
                         logger.error(f"Fehler beim Aktualisieren der Metadaten für Episode {season['season_number']}x{episode['episode_number']}")
             except Exception as e:
                 logger.error(f"Fehler bei der Episoden-Metadaten-Verbesserung: {str(e)}")
+            finally:
+                release_enhancement(in_flight_key)
 
-        # Starte den Thread
-        thread = threading.Thread(target=enhance_episode_thread)
-        thread.daemon = True
-        thread.start()
+        try:
+            _enhance_pool.submit(enhance_episode_thread)
+        except Exception:
+            release_enhancement(in_flight_key)
+            raise
 
         return jsonify({
             'status': 'success',
@@ -1117,18 +1801,13 @@ def enhance_episode_metadata(episode_id):
 @app.route('/api/media/enhance/all', methods=['POST'])
 def enhance_all_media_metadata():
     """Verbessert die Metadaten aller Serien/Animes mit Hilfe der Gemini API."""
+    gemini_client = get_gemini_client()
     if not gemini_client:
-        return jsonify({
-            'status': 'error',
-            'error': 'Gemini API ist nicht aktiviert'
-        }), 400
+        return ERR_GEMINI_DISABLED()
 
     try:
-        # Hole alle Medien aus der Datenbank
-        all_media = media_db.get_all_media()
-
-        # Filtere Medien, die noch nicht verbessert wurden
-        media_to_enhance = [m for m in all_media if not m.get('ai_enhanced')]
+        # Hole nur die Medien, die noch nicht verbessert wurden (Filter direkt in SQL)
+        media_to_enhance = get_media_database().get_media_needing_enhancement()
 
         if not media_to_enhance:
             return jsonify({
@@ -1136,37 +1815,72 @@ def enhance_all_media_metadata():
                 'message': 'Alle Medien wurden bereits verbessert'
             })
 
-        # Starte die Metadaten-Verbesserung in einem separaten Thread
-        def enhance_all_thread():
+        # Starte die Metadaten-Verbesserung im Hintergrund-Pool
+        def enhance_one(media):
+            if _enhance_stop.is_set():
+                return media, None
             try:
-                for media in media_to_enhance:
-                    try:
-                        # Verbessere die Metadaten mit Gemini
-                        enhanced_metadata = gemini_client.enhance_series_metadata(media['title'])
+                # Verbessere die Metadaten mit Gemini
+                # Token-Bucket statt fester Pause, um die API nicht zu überlasten
+                return media, call_gemini(gemini_client.enhance_series_metadata, media['title'])
+            except Exception as e:
+                logger.error(f"Fehler bei der Metadaten-Verbesserung für '{media['title']}': {str(e)}")
+                return media, None
+
+        def flush_metadata(batch):
+            # Mehrere Updates teilen sich eine Transaktion statt je eines Commits
+            updated = get_media_database().update_media_metadata_batch(
+                [(media['id'], metadata) for media, metadata in batch]
+            )
+            invalidate_read_cache()
+            if updated:
+                logger.info(f"Metadaten für {updated} Medien erfolgreich verbessert")
+            else:
+                titles = ', '.join(f"'{media['title']}'" for media, _ in batch)
+                logger.error(f"Fehler beim Aktualisieren der Metadaten für {titles}")
 
-                        # Aktualisiere die Datenbank
+        def enhance_all_thread():
+            # Medien, die gerade einzeln (oder von einem früheren Durchlauf) verbessert werden, überspringen
+            claimed = [media for media in media_to_enhance if claim_enhancement(('media', media['id']))]
+            try:
+                batch = []
+                last_flush = time.monotonic()
+                # Anfragen laufen parallel, Parallelitätslimit und Token-Bucket in call_gemini begrenzen die Last
+                # Ergebnisse in Abschlussreihenfolge einsammeln, damit langsame Antworten die übrigen nicht aufhalten
+                executor = ThreadPoolExecutor(max_workers=_gemini_max_concurrency(), thread_name_prefix="enhance-all")
+                try:
+                    futures = [executor.submit(enhance_one, media) for media in claimed]
+                    for future in as_completed(futures):
+                        if _enhance_stop.is_set():
+                            break
+                        media, enhanced_metadata = future.result()
                         if enhanced_metadata:
-                            success = media_db.update_media_metadata(media['id'], enhanced_metadata)
-                            if success:
-                                logger.info(f"Metadaten für '{media['title']}' erfolgreich verbessert")
-                            else:
-                                logger.error(f"Fehler beim Aktualisieren der Metadaten für '{media['title']}'")
-
-                        # Kurze Pause, um die API nicht zu überlasten
-                        import time
-                        time.sleep(1)
-                    except Exception as e:
-                        logger.error(f"Fehler bei der Metadaten-Verbesserung für '{media['title']}': {str(e)}")
-                        continue
-
-                logger.info(f"Metadaten-Verbesserung für {len(media_to_enhance)} Medien abgeschlossen")
+                            batch.append((media, enhanced_metadata))
+                        # Nach Anzahl oder Zeit schreiben, damit bei einem Abbruch wenig Ergebnisse verloren gehen
+                        if batch and (len(batch) >= ENHANCE_COMMIT_BATCH_SIZE
+                                      or time.monotonic() - last_flush >= ENHANCE_COMMIT_INTERVAL):
+                            flush_metadata(batch)
+                            batch = []
+                            last_flush = time.monotonic()
+                finally:
+                    # Beim Beenden nicht auf die restlichen Anfragen warten
+                    stopping = _enhance_stop.is_set()
+                    executor.shutdown(wait=not stopping, cancel_futures=stopping)
+
+                if batch:
+                    flush_metadata(batch)
+
+                if _enhance_stop.is_set():
+                    logger.info("Metadaten-Verbesserung beim Beenden abgebrochen")
+                else:
+                    logger.info(f"Metadaten-Verbesserung für {len(claimed)} Medien abgeschlossen")
             except Exception as e:
                 logger.error(f"Fehler bei der Metadaten-Verbesserung: {str(e)}")
+            finally:
+                for media in claimed:
+                    release_enhancement(('media', media['id']))
 
-        # Starte den Thread
-        thread = threading.Thread(target=enhance_all_thread)
-        thread.daemon = True
-        thread.start()
+        _enhance_pool.submit(enhance_all_thread)
 
         return jsonify({
             'status': 'success',
@@ -1186,35 +1900,32 @@ def manage_language_settings():
         # Gib die aktuellen Language Guard Einstellungen zurück
         return jsonify({
             'status': 'success',
-            'prefer': config.get('language.prefer', ['de', 'deu', 'ger']),
-            'require_dub': config.get('language.require_dub', True),
-            'sample_seconds': config.get('language.sample_seconds', 45),
-            'remux_to_de_if_present': config.get('language.remux_to_de_if_present', True),
-            'accept_on_error': config.get('language.accept_on_error', False)
+            'prefer': list(config.get_language_prefer()),
+            'require_dub': _cached_cfg('language.require_dub', True),
+            'sample_seconds': _cached_cfg('language.sample_seconds', 45),
+            'remux_to_de_if_present': _cached_cfg('language.remux_to_de_if_present', True),
+            'accept_on_error': _cached_cfg('language.accept_on_error', False)
         })
     elif request.method == 'POST':
         try:
-            data = request.json
+            data = request_json()
 
             if not data:
-                return jsonify({
-                    'status': 'error',
-                    'error': 'Keine Daten angegeben'
-                }), 400
+                return ERR_NO_DATA()
 
             # Aktualisiere die Konfiguration
-            if 'language' not in config.config:
-                config.config['language'] = {}
+            with config.lock:
+                if 'language' not in config.config:
+                    config.config['language'] = {}
 
-            config.config['language']['prefer'] = data.get('prefer', ['de', 'deu', 'ger'])
-            config.config['language']['require_dub'] = data.get('require_dub', True)
-            config.config['language']['sample_seconds'] = data.get('sample_seconds', 45)
-            config.config['language']['remux_to_de_if_present'] = data.get('remux_to_de_if_present', True)
-            config.config['language']['accept_on_error'] = data.get('accept_on_error', False)
+                config.config['language']['prefer'] = data.get('prefer', ['de', 'deu', 'ger'])
+                config.config['language']['require_dub'] = data.get('require_dub', True)
+                config.config['language']['sample_seconds'] = data.get('sample_seconds', 45)
+                config.config['language']['remux_to_de_if_present'] = data.get('remux_to_de_if_present', True)
+                config.config['language']['accept_on_error'] = data.get('accept_on_error', False)
 
-            # Speichere die Konfiguration
-            with open('config.json', 'w') as f:
-                json.dump(config.config, f, indent=4)
+            # Speichere die Konfiguration (gebündelt im Hintergrund)
+            config.save_later()
 
             return jsonify({
                 'status': 'success',
@@ -1231,22 +1942,21 @@ def manage_language_settings():
 def download_voe():
     """Endpoint für direkten VOE.sx Download"""
     try:
-        data = request.get_json()
+        data = request_json()
         voe_url = data.get('url')
         filename = data.get('filename')
 
         if not voe_url:
             return jsonify({'error': 'VOE.sx URL ist erforderlich'}), 400
 
-        # Starte den Download in einem separaten Thread
+        # Starte den Download im Download-Pool
         def download_thread():
             try:
-                scraper.download_direct_voe(voe_url, filename)
+                get_scraper().download_direct_voe(voe_url, filename)
             except Exception as e:
                 logger.error(f"Fehler beim VOE.sx Download: {str(e)}")
 
-        thread = threading.Thread(target=download_thread)
-        thread.start()
+        _download_pool.submit(download_thread)
 
         return jsonify({'message': 'Download gestartet'})
 
@@ -1254,85 +1964,134 @@ def download_voe():
         logger.error(f"Fehler beim Verarbeiten der VOE.sx Download-Anfrage: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/episode/variants', methods=['POST'])
-def get_episode_variants():
+def variants_payload(all_variants, include_variants: bool = True) -> dict:
     """
-    Zentraler Endpoint für Episode-Varianten-Auswahl.
-    Sammelt Varianten von allen verfügbaren Quellen und wählt die beste aus.
+    Sortiert die Varianten nach Präferenz und wählt die beste aus.
+
+    Sortierung und Auswahl erfolgen in einem Durchlauf; jede Variante wird genau einmal in ein
+    Dict umgewandelt und 'best' verweist auf denselben Eintrag. Ohne include_variants wird nicht
+    sortiert, sondern nur die beste Variante linear gesucht und die Liste weggelassen.
     """
-    try:
-        data = request.json
-        if not data:
-            return jsonify({'error': 'Keine Daten angegeben'}), 400
+    if not include_variants:
+        best_variant = best_by_preference(all_variants)
+        payload = {
+            'ok': True,
+            'best': best_variant.to_dict() if best_variant is not None else None,
+            'total_variants': len(all_variants)
+        }
+        if best_variant is None:
+            payload['note'] = 'Keine exakte Präferenz gefunden.'
+        return payload
 
-        episode_url = data.get('url')
-        season = data.get('season')
-        episode = data.get('episode')
+    best_variant, sorted_variants = sort_by_preference_with_best(all_variants)
+    variants = [variant.to_dict() for variant in sorted_variants]
 
-        if not episode_url:
-            return jsonify({'error': 'Episode-URL ist erforderlich'}), 400
+    if best_variant is None:
+        # Fallback: sortierte Liste zurückgeben
+        return {
+            'ok': True,
+            'best': None,
+            'variants': variants,
+            'note': 'Keine exakte Präferenz gefunden – Varianten sortiert.',
+            'total_variants': len(variants)
+        }
 
-        logger.info(f"🔍 Sammle Varianten für Episode: {episode_url}")
+    # Die beste Variante steht nach der Sortierung vorne
+    return {
+        'ok': True,
+        'best': variants[0],
+        'variants': variants,
+        'total_variants': len(variants)
+    }
 
-        # Sammle Varianten von allen verfügbaren Scrapern
-        all_variants = []
 
-        # Verwende den integrierten Scraper um Varianten zu sammeln
-        try:
-            # Temporäres StreamScraper-Objekt für Varianten-Sammlung
-            temp_scraper = StreamScraper(
-                download_dir=config.get('download.directory', 'downloads'),
-                max_parallel_downloads=1,
-                max_parallel_extractions=3
-            )
+# Varianten-Antworten werden pro (URL, Staffel, Episode) zwischengespeichert, da die UI häufig pollt
+VARIANT_CACHE_TTL = 300.0
+VARIANT_CACHE_MAX_ENTRIES = 512
+_variant_cache: OrderedDict = OrderedDict()
+_variant_cache_lock = threading.Lock()
 
-            # Extrahiere Varianten für diese Episode
-            variants = temp_scraper.extract_stream_urls(
-                episode_url,
-                temp_scraper.get_base_url(episode_url),
-                season,
-                episode
-            )
 
-            if variants:
-                all_variants.extend(variants)
-                logger.info(f"📺 Gefunden: {len(variants)} Varianten vom Haupt-Scraper")
+def _collect_variants(episode_url, season, episode, include_variants: bool = True) -> Optional[dict]:
+    """Sammelt die Varianten aller Scraper und liefert das Antwort-Payload oder None, wenn keine gefunden wurden."""
+    all_variants = []
 
-        except Exception as e:
-            logger.warning(f"Haupt-Scraper fehlgeschlagen: {str(e)}")
+    # Verwende den integrierten Scraper um Varianten zu sammeln
+    try:
+        variant_scraper = get_variant_scraper()
+
+        # Extrahiere Varianten für diese Episode
+        variants = variant_scraper.extract_stream_urls(
+            episode_url,
+            variant_scraper.get_base_url(episode_url),
+            season,
+            episode
+        )
+
+        if variants:
+            all_variants.extend(variants)
+            logger.info(f"📺 Gefunden: {len(variants)} Varianten vom Haupt-Scraper")
+
+    except Exception as e:
+        logger.warning(f"Haupt-Scraper fehlgeschlagen: {str(e)}")
+
+    # Fallback: Direkte VOE-Links versuchen falls verfügbar
+    if not all_variants:
+        logger.info("🔄 Versuche direkte VOE-Links...")
+        # Hier könnten weitere Scraper-Integrationen hinzugefügt werden
 
-        # Fallback: Direkte VOE-Links versuchen falls verfügbar
-        if not all_variants:
-            logger.info("🔄 Versuche direkte VOE-Links...")
-            # Hier könnten weitere Scraper-Integrationen hinzugefügt werden
+    if not all_variants:
+        return None
+
+    # Gib beste Variante + sortierte Liste zurück
+    return variants_payload(all_variants, include_variants)
+
+
+def cached_variants(episode_url, season, episode, use_cache: bool = True,
+                    include_variants: bool = True) -> Optional[dict]:
+    """
+    Liefert das Varianten-Payload aus dem LRU/TTL-Cache oder sammelt es neu.
+
+    Die Konfigurationsversion ist Teil des Schlüssels, damit geänderte Sprachpräferenzen sofort
+    greifen. Leere Ergebnisse werden nicht gespeichert; das Payload darf nicht verändert werden.
+    """
+    key = (episode_url, season, episode, include_variants, config.version)
+    now = time.monotonic()
+    if use_cache:
+        with _variant_cache_lock:
+            entry = _variant_cache.get(key)
+            if entry is not None and entry[0] > now:
+                _variant_cache.move_to_end(key)
+                return entry[1]
+
+    payload = _collect_variants(episode_url, season, episode, include_variants)
+    if payload is not None:
+        with _variant_cache_lock:
+            _variant_cache[key] = (now + VARIANT_CACHE_TTL, payload)
+            _variant_cache.move_to_end(key)
+            while len(_variant_cache) > VARIANT_CACHE_MAX_ENTRIES:
+                _variant_cache.popitem(last=False)
+    return payload
+
+
+def _variants_response(episode_url, season, episode):
+    """
+    Gemeinsame Antwort beider Varianten-Endpoints inklusive Fehlerbehandlung.
 
-        if not all_variants:
+    Query-Parameter: ?nocache=1 umgeht den Cache, ?include_variants=0 liefert nur 'best'
+    und 'total_variants' ohne die sortierte Liste.
+    """
+    try:
+        use_cache = request.args.get('nocache', '') not in ('1', 'true')
+        include_variants = request.args.get('include_variants', '1') != '0'
+        payload = cached_variants(episode_url, season, episode, use_cache=use_cache,
+                                  include_variants=include_variants)
+        if payload is None:
             return jsonify({
                 'ok': False,
                 'error': 'Keine Varianten gefunden'
             }), 404
-
-        # Wähle die beste Variante
-        best_variant = pick_best(all_variants)
-        if not best_variant:
-            # Fallback: sortierte Liste zurückgeben
-            sorted_variants = sort_by_preference(all_variants)
-            return jsonify({
-                'ok': True,
-                'best': None,
-                'variants': [variant.__dict__ for variant in sorted_variants],
-                'note': 'Keine exakte Präferenz gefunden – Varianten sortiert.',
-                'total_variants': len(sorted_variants)
-            }), 200
-
-        # Gib beste Variante + sortierte Liste zurück
-        sorted_variants = sort_by_preference(all_variants)
-        return jsonify({
-            'ok': True,
-            'best': best_variant.__dict__,
-            'variants': [variant.__dict__ for variant in sorted_variants],
-            'total_variants': len(sorted_variants)
-        }), 200
+        return json_response(payload)
 
     except Exception as e:
         logger.error(f"Fehler beim Sammeln der Varianten: {str(e)}", exc_info=True)
@@ -1341,108 +2100,138 @@ def get_episode_variants():
             'error': str(e)
         }), 500
 
+
+@app.route('/api/episode/variants', methods=['POST'])
+def get_episode_variants():
+    """
+    Zentraler Endpoint für Episode-Varianten-Auswahl.
+    Sammelt Varianten von allen verfügbaren Quellen und wählt die beste aus.
+    """
+    data = request_json()
+    if not data:
+        return jsonify({'error': 'Keine Daten angegeben'}), 400
+
+    episode_url = data.get('url')
+    if not episode_url:
+        return jsonify({'error': 'Episode-URL ist erforderlich'}), 400
+
+    logger.info(f"🔍 Sammle Varianten für Episode: {episode_url}")
+    return _variants_response(episode_url, data.get('season'), data.get('episode'))
+
 @app.route('/api/episode/variants/<path:series_url>', methods=['GET'])
 def get_episode_variants_by_series(series_url):
     """
     Sammelt Varianten für eine Serie basierend auf der Series-URL.
     Dies ist ein Beispiel-Endpoint - in der Praxis würde man Series-IDs verwenden.
     """
-    try:
-        # Parameter aus Query-String
-        season = request.args.get('season', type=int)
-        episode = request.args.get('episode', type=int)
-
-        if not season or not episode:
-            return jsonify({
-                'error': 'Season und Episode Parameter sind erforderlich'
-            }), 400
-
-        logger.info(f"🔍 Sammle Varianten für {series_url} S{season}E{episode}")
-
-        # Hier würde die echte Implementierung die Series-URL in eine Episode-URL umwandeln
-        # Für dieses Beispiel verwenden wir die Series-URL direkt als Episode-URL
-        episode_url = series_url
-
-        # Sammle Varianten (gleiche Logik wie oben)
-        all_variants = []
-
-        try:
-            temp_scraper = StreamScraper(
-                download_dir=config.get('download.directory', 'downloads'),
-                max_parallel_downloads=1,
-                max_parallel_extractions=3
-            )
-
-            variants = temp_scraper.extract_stream_urls(
-                episode_url,
-                temp_scraper.get_base_url(episode_url),
-                season,
-                episode
-            )
+    # Parameter aus Query-String
+    season = request.args.get('season', type=int)
+    episode = request.args.get('episode', type=int)
 
-            if variants:
-                all_variants.extend(variants)
-                logger.info(f"📺 Gefunden: {len(variants)} Varianten")
-
-        except Exception as e:
-            logger.warning(f"Scraper fehlgeschlagen: {str(e)}")
-
-        if not all_variants:
-            return jsonify({
-                'ok': False,
-                'error': 'Keine Varianten gefunden'
-            }), 404
-
-        # Wähle die beste Variante
-        best_variant = pick_best(all_variants)
-        if not best_variant:
-            sorted_variants = sort_by_preference(all_variants)
-            return jsonify({
-                'ok': True,
-                'best': None,
-                'variants': [variant.__dict__ for variant in sorted_variants],
-                'note': 'Keine exakte Präferenz gefunden – Varianten sortiert.',
-                'total_variants': len(sorted_variants)
-            }), 200
-
-        sorted_variants = sort_by_preference(all_variants)
+    if not season or not episode:
         return jsonify({
-            'ok': True,
-            'best': best_variant.__dict__,
-            'variants': [variant.__dict__ for variant in sorted_variants],
-            'total_variants': len(sorted_variants)
-        }), 200
+            'error': 'Season und Episode Parameter sind erforderlich'
+        }), 400
 
-    except Exception as e:
-        logger.error(f"Fehler beim Sammeln der Varianten: {str(e)}", exc_info=True)
-        return jsonify({
-            'ok': False,
-            'error': str(e)
-        }), 500
+    logger.info(f"🔍 Sammle Varianten für {series_url} S{season}E{episode}")
+
+    # Hier würde die echte Implementierung die Series-URL in eine Episode-URL umwandeln
+    # Für dieses Beispiel verwenden wir die Series-URL direkt als Episode-URL
+    return _variants_response(series_url, season, episode)
 
 # WebSocket Routes
 @socketio.on('connect')
 def handle_connect():
     """Handle client connection"""
     logger.info(f"Client connected: {request.sid}")
-    socketio.emit(
-        'download_progress',
-        {
-            'job': _copy_progress(),
-            'is_downloading': bool(scraper.download_status.is_downloading),
-        },
-        room=request.sid
-    )
-    # Send current status on connect
-    status = scraper.download_status.get_status()
-    socketio.emit('status_update', status, room=request.sid)
+    download_status = get_scraper().download_status
+    # Der neue Client bekommt den zuletzt an alle gesendeten Stand, auf den die folgenden Deltas aufsetzen
+    with _progress_sent_lock:
+        sent = _last_progress_sent
+        socketio.emit(
+            'download_progress',
+            sent if sent is not None else {
+                'job': _copy_progress(),
+                'is_downloading': bool(download_status.is_downloading),
+            },
+            room=request.sid
+        )
+    # Bestehende Clients erst auf den aktuellen Stand bringen, dann den vollen Status samt Version an den neuen Client
+    _broadcast_status_delta(download_status, sid=request.sid)
+
+@socketio.on('request_status')
+def handle_request_status():
+    """Schickt einem Client, der eine Lücke in den Status-Deltas bemerkt hat, den vollen Status."""
+    _broadcast_status_delta(get_scraper().download_status, sid=request.sid)
 
 @socketio.on('disconnect')
 def handle_disconnect():
     """Handle client disconnection"""
     logger.info(f"Client disconnected: {request.sid}")
 
+def _set_sqlite_pragmas(dbapi_conn, _connection_record) -> None:
+    # WAL erlaubt parallele Leser neben dem Scanner-/Download-Schreiber
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.execute("PRAGMA cache_size=-20000")
+    cursor.close()
+
+
+def create_app() -> Flask:
+    """
+    Konfiguriere die App, initialisiere Erweiterungen und Datenbank und starte den Startup-Scan.
+
+    Der Import von app.py hat dadurch keine Seiteneffekte; Einstiegspunkte rufen create_app() auf.
+
+    Returns:
+        Flask: Die initialisierte App
+    """
+    global _app_initialized
+    if _app_initialized:
+        return app
+
+    streams_db_path = BASE_DIR / 'streams.db'
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{streams_db_path.as_posix()}'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Eigener Verbindungspool: Hintergrund-Threads (Scan, Gemini, Downloads) und Requests teilen sich die Engine
+    # pool_size/max_overflow setzen SQLAlchemy 2.0 voraus (QueuePool für SQLite-Dateien, siehe requirements.txt)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'pool_size': 10,
+        'max_overflow': 10,
+        'connect_args': {'check_same_thread': False, 'timeout': 30},
+    }
+    app.config['SECRET_KEY'] = 'streamscraper-secret-key'
+    db.init_app(app)
+    # "threading" ist der Standard für den eingebauten Server; "gevent"/"eventlet" setzen voraus,
+    # dass der Prozess unter dem jeweiligen Server läuft und vor allen Imports gepatcht wurde
+    async_mode = _cached_cfg('server.async_mode', 'threading') or 'threading'
+    socketio.init_app(app, cors_allowed_origins="*", async_mode=async_mode)
+
+    # Erstelle die Datenbank
+    with app.app_context():
+        event.listen(db.engine, "connect", _set_sqlite_pragmas)
+        db.create_all()
+        sync_libraries_from_config()
+
+        ensure_series_fts()
+
+        # create_all legt Indizes nur für neue Tabellen an
+        for index in (*Series.__table__.indexes, *Library.__table__.indexes):
+            try:
+                index.create(db.engine, checkfirst=True)
+            except Exception as exc:
+                logger.warning(f"Index {index.name} konnte nicht angelegt werden: {exc}")
+
+    start_startup_scan()
+
+    _app_initialized = True
+    return app
+
 if __name__ == '__main__':
+    create_app()
     port = int(config.get('server.port', 5000))
     debug = _as_bool(config.get('server.debug', False))
     host = config.get('server.host', '127.0.0.1')
@@ -4,11 +4,23 @@ Combines settings from .env, config.json, and environment variables.
 """
 
 import os
+import copy
 import json
+import time
+import atexit
 import logging
-from typing import Any, Dict, List, Optional, Tuple
+import threading
+from collections import deque
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:  # optional, json is the fallback
+    orjson = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.DEBUG,
@@ -16,10 +28,95 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Marks keys missing from the flat lookup table (None is a valid config value)
+_MISSING = object()
+
+
+@lru_cache(maxsize=8)
+def _parse_config(path: str, mtime_ns: int, size: int) -> Dict:
+    """
+    Read and parse a config file, cached per (path, mtime, size).
+
+    The returned dict is shared between callers and must not be modified.
+    """
+    with open(path, 'rb') as f:
+        raw = f.read()
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw.decode('utf-8'))
+
+
+# .env files already parsed in this process; load_dotenv never overrides set variables,
+# so parsing the same file again would not change anything
+_loaded_env_files = set()
+
+
+def _load_env_file(env_file: str) -> None:
+    """Load a .env file at most once per process, and only if it exists."""
+    path = os.path.abspath(env_file)
+    if path in _loaded_env_files:
+        return
+    _loaded_env_files.add(path)
+    if os.path.exists(path):
+        load_dotenv(path)
+
+
+# Spellings accepted as true by every boolean environment override
+_TRUTHY = frozenset(("true", "1", "t", "yes", "y", "on"))
+
+
+def _env_to_bool(raw: str) -> bool:
+    return raw.strip().lower() in _TRUTHY
+
+
+def _env_to_list(raw: str) -> Optional[List[str]]:
+    values = [part.strip().lower() for part in raw.split(',') if part.strip()]
+    return values or None
+
+
+# Environment overrides: (variable, dotted config path, coercion).
+# Coercions raising ValueError keep the default; returning None skips the variable.
+_ENV_MAP: Tuple[Tuple[str, str, Any], ...] = (
+    # Download settings
+    ("DOWNLOAD_DIR", "download.directory", str),
+    ("MAX_PARALLEL_DOWNLOADS", "download.max_parallel_downloads", int),
+    ("MAX_PARALLEL_EXTRACTIONS", "download.max_parallel_extractions", int),
+    ("SCAN_ON_STARTUP", "download.scan_on_startup", _env_to_bool),
+    ("DB_PATH", "download.db_path", str),
+    # Language priority settings
+    ("LANGUAGE_PRIORITY_ENABLED", "language_priority.enabled", _env_to_bool),
+    ("LANGUAGE_FALLBACK_PRIORITY", "language.fallback_priority", _env_to_list),
+    # Server settings
+    ("FLASK_PORT", "server.port", int),
+    ("FLASK_DEBUG", "server.debug", _env_to_bool),
+    # Real-Debrid settings
+    ("REAL_DEBRID_ENABLED", "real_debrid.enabled", _env_to_bool),
+    ("REAL_DEBRID_API_KEY", "real_debrid.api_key", str),
+    # Gemini settings
+    ("GEMINI_ENABLED", "gemini.enabled", _env_to_bool),
+    ("GEMINI_API_KEY", "gemini.api_key", str),
+    ("GEMINI_MODEL", "gemini.model", str),
+    ("GEMINI_AUTO_ENHANCE_METADATA", "gemini.auto_enhance_metadata", _env_to_bool),
+)
+
+
+# Fallback for get_language_priority when nothing usable is configured
+_DEFAULT_LANGUAGE_PRIORITY: Tuple[Tuple[Optional[str], Optional[str]], ...] = (
+    ("de", None),
+    ("en", "de"),
+    ("ja", "de"),
+    ("ja", "en"),
+    ("ja", None),
+    ("en", None),
+)
+
 
 class ConfigManager:
     """Centralized configuration manager for StreamScraper."""
 
+    # Delay used to coalesce bursts of changes into a single write
+    SAVE_DELAY = 0.5
+
     def __init__(self, config_file: str = "config.json", env_file: str = ".env"):
         """
         Initialize the configuration manager.
@@ -28,13 +125,31 @@ class ConfigManager:
             config_file (str): Path to the config.json file
             env_file (str): Path to the .env file
         """
+        self.config_file = config_file
+
+        # Guards self.config; request handlers hold it while they modify settings
+        self.lock = threading.RLock()
+
+        # Debounced background writer (see save_later); _pending is the latest snapshot to write
+        self._dirty = threading.Event()
+        self._pending: Optional[Dict] = None
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+        self._save_lock = threading.Lock()
+
+        # Incremented on every announced change; derived values are cached per version
+        self.version = 0
+        self._derived: Dict[str, Tuple[int, Any]] = {}
+
         # Load environment variables
-        load_dotenv(env_file)
+        _load_env_file(env_file)
 
         # Initialize config
         self.config = {
             # Default values
             "libraries": [],
+            # fsync config.json on save (off by default)
+            "durable_writes": False,
             "download": {
                 "directory": "downloads",
                 "max_parallel_downloads": 3,
@@ -42,10 +157,15 @@ class ConfigManager:
                 "scan_on_startup": True,
                 "db_path": "media.db"
             },
+            "scan": {
+                "parallelism": 4,
+                "sort_by_inode": False
+            },
             "server": {
                 "port": 5000,
                 "debug": True,
-                "host": "0.0.0.0"
+                "host": "0.0.0.0",
+                "async_mode": "threading"
             },
             "real_debrid": {
                 "enabled": False,
@@ -65,7 +185,9 @@ class ConfigManager:
                 "enabled": False,
                 "api_key": "",
                 "model": "gemini-1.5-pro-latest",
-                "auto_enhance_metadata": False
+                "auto_enhance_metadata": False,
+                "max_concurrency": 2,
+                "requests_per_second": 1.0
             },
             "language": {
                 "prefer": ["de", "deu", "ger"],
@@ -107,8 +229,9 @@ class ConfigManager:
         """
         try:
             if os.path.exists(config_file):
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    file_config = json.load(f)
+                st = os.stat(config_file)
+                # Copy so the merge below cannot alter the cached parse result
+                file_config = copy.deepcopy(_parse_config(config_file, st.st_mtime_ns, st.st_size))
 
                 # Update config with file values
                 self._update_nested_dict(self.config, file_config)
@@ -120,94 +243,35 @@ class ConfigManager:
 
     def _load_env_variables(self) -> None:
         """Load configuration from environment variables."""
-        def _env_to_bool(raw: Optional[str]) -> Optional[bool]:
-            if raw is None:
-                return None
-            return raw.strip().lower() in ("true", "1", "t", "yes", "on")
-
-        # Download settings
-        if os.getenv('DOWNLOAD_DIR'):
-            self.config['download']['directory'] = os.getenv('DOWNLOAD_DIR')
-
-        if os.getenv('MAX_PARALLEL_DOWNLOADS'):
-            try:
-                self.config['download']['max_parallel_downloads'] = int(os.getenv('MAX_PARALLEL_DOWNLOADS'))
-            except ValueError:
-                logger.warning("Invalid MAX_PARALLEL_DOWNLOADS value, using default")
-
-        if os.getenv('MAX_PARALLEL_EXTRACTIONS'):
-            try:
-                self.config['download']['max_parallel_extractions'] = int(os.getenv('MAX_PARALLEL_EXTRACTIONS'))
-            except ValueError:
-                logger.warning("Invalid MAX_PARALLEL_EXTRACTIONS value, using default")
-
-        if os.getenv('SCAN_ON_STARTUP'):
-            value = _env_to_bool(os.getenv('SCAN_ON_STARTUP'))
-            if value is not None:
-                self.config['download']['scan_on_startup'] = value
-
-        if os.getenv('DB_PATH'):
-            self.config['download']['db_path'] = os.getenv('DB_PATH')
-
-        # Language priority settings
-        if os.getenv('LANGUAGE_PRIORITY_ENABLED'):
-            value = _env_to_bool(os.getenv('LANGUAGE_PRIORITY_ENABLED'))
-            if value is not None:
-                self.config['language_priority']['enabled'] = value
-
-        if os.getenv('LANGUAGE_FALLBACK_PRIORITY'):
-            fallback = [part.strip().lower() for part in os.getenv('LANGUAGE_FALLBACK_PRIORITY').split(',') if part.strip()]
-            if fallback:
-                self.config['language']['fallback_priority'] = fallback
-
-        # Server settings
-        if os.getenv('FLASK_PORT'):
-            try:
-                self.config['server']['port'] = int(os.getenv('FLASK_PORT'))
-            except ValueError:
-                logger.warning("Invalid FLASK_PORT value, using default")
-
-        if os.getenv('FLASK_DEBUG'):
-            value = _env_to_bool(os.getenv('FLASK_DEBUG'))
-            if value is not None:
-                self.config['server']['debug'] = value
-
-        # Real-Debrid settings
-        if os.getenv('REAL_DEBRID_ENABLED'):
-            value = _env_to_bool(os.getenv('REAL_DEBRID_ENABLED'))
-            if value is not None:
-                self.config['real_debrid']['enabled'] = value
-
-        if os.getenv('REAL_DEBRID_API_KEY'):
-            self.config['real_debrid']['api_key'] = os.getenv('REAL_DEBRID_API_KEY')
-            if self.config['real_debrid']['api_key']:
-                self.config['real_debrid']['enabled'] = True
-
-        # Jellyfin settings
-        if all([os.getenv('JELLYFIN_URL'), os.getenv('JELLYFIN_API_KEY'), os.getenv('JELLYFIN_USER_ID')]):
-            self.config['jellyfin']['enabled'] = True
-            self.config['jellyfin']['url'] = os.getenv('JELLYFIN_URL')
-            self.config['jellyfin']['api_key'] = os.getenv('JELLYFIN_API_KEY')
-            self.config['jellyfin']['user_id'] = os.getenv('JELLYFIN_USER_ID')
-
-        # Gemini settings
-        if os.getenv('GEMINI_ENABLED'):
-            value = _env_to_bool(os.getenv('GEMINI_ENABLED'))
-            if value is not None:
-                self.config['gemini']['enabled'] = value
+        for env_name, path, coerce in _ENV_MAP:
+            raw = os.environ.get(env_name)
+            if not raw:
+                continue
+            try:
+                value = coerce(raw)
+            except ValueError:
+                logger.warning(f"Invalid {env_name} value, using default")
+                continue
+            if value is None:
+                continue
 
-        if os.getenv('GEMINI_API_KEY'):
-            self.config['gemini']['api_key'] = os.getenv('GEMINI_API_KEY')
-            if self.config['gemini']['api_key']:
-                self.config['gemini']['enabled'] = True
-
-        if os.getenv('GEMINI_MODEL'):
-            self.config['gemini']['model'] = os.getenv('GEMINI_MODEL')
-
-        if os.getenv('GEMINI_AUTO_ENHANCE_METADATA'):
-            value = _env_to_bool(os.getenv('GEMINI_AUTO_ENHANCE_METADATA'))
-            if value is not None:
-                self.config['gemini']['auto_enhance_metadata'] = value
+            *sections, leaf = path.split('.')
+            target = self.config
+            for section in sections:
+                target = target.setdefault(section, {})
+            target[leaf] = value
+
+        # An API key implies the service is enabled
+        if os.environ.get('REAL_DEBRID_API_KEY'):
+            self.config['real_debrid']['enabled'] = True
+
+        if os.environ.get('GEMINI_API_KEY'):
+            self.config['gemini']['enabled'] = True
+
+        # Jellyfin settings are only applied when all three are present
+        url, api_key, user_id = (os.environ.get(name) for name in ('JELLYFIN_URL', 'JELLYFIN_API_KEY', 'JELLYFIN_USER_ID'))
+        if url and api_key and user_id:
+            self.config['jellyfin'].update(enabled=True, url=url, api_key=api_key, user_id=user_id)
 
     def _update_nested_dict(self, d: Dict, u: Dict) -> Dict:
         """
@@ -220,29 +284,39 @@ class ConfigManager:
         Returns:
             Dict: Updated dictionary
         """
-        for k, v in u.items():
-            if isinstance(v, dict) and k in d and isinstance(d[k], dict):
-                d[k] = self._update_nested_dict(d[k], v)
-            else:
-                d[k] = v
+        # Explicit worklist instead of recursion; nested dicts are merged in place
+        pending = deque([(d, u)])
+        while pending:
+            target, source = pending.popleft()
+            for k, v in source.items():
+                current = target.get(k)
+                if isinstance(v, dict) and isinstance(current, dict):
+                    pending.append((current, v))
+                else:
+                    target[k] = v
         return d
 
     def _log_config(self) -> None:
         """Log the current configuration (excluding sensitive data)."""
+        # Serializing the whole config is only worth it if the message is emitted
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+
         # Create a copy of the config without sensitive data
         safe_config = self.config.copy()
 
-        # Remove sensitive data
-        if 'real_debrid' in safe_config and 'api_key' in safe_config['real_debrid']:
-            safe_config['real_debrid']['api_key'] = '***' if safe_config['real_debrid']['api_key'] else ''
+        # Remove sensitive data (mask in copies so the live sections keep their keys)
+        for section in ('real_debrid', 'jellyfin', 'gemini'):
+            if isinstance(safe_config.get(section), dict) and 'api_key' in safe_config[section]:
+                masked = dict(safe_config[section])
+                masked['api_key'] = '***' if masked['api_key'] else ''
+                safe_config[section] = masked
 
-        if 'jellyfin' in safe_config and 'api_key' in safe_config['jellyfin']:
-            safe_config['jellyfin']['api_key'] = '***' if safe_config['jellyfin']['api_key'] else ''
-
-        if 'gemini' in safe_config and 'api_key' in safe_config['gemini']:
-            safe_config['gemini']['api_key'] = '***' if safe_config['gemini']['api_key'] else ''
-
-        logger.debug(f"Current configuration: {json.dumps(safe_config, indent=2)}")
+        if orjson is not None:
+            dumped = orjson.dumps(safe_config, option=orjson.OPT_INDENT_2).decode('utf-8')
+        else:
+            dumped = json.dumps(safe_config, indent=2)
+        logger.debug(f"Current configuration: {dumped}")
 
     def get(self, key: str, default: Any = None) -> Any:
         """
@@ -255,6 +329,11 @@ class ConfigManager:
         Returns:
             Any: Configuration value
         """
+        value = self._cached_derived("flat", self._build_flat).get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        # Slow path for keys added by direct edits that have not bumped version yet
         keys = key.split('.')
         value = self.config
 
@@ -265,6 +344,24 @@ class ConfigManager:
         except (KeyError, TypeError):
             return default
 
+    def _build_flat(self) -> Dict[str, Any]:
+        """
+        Build the dot-notation lookup table used by get().
+
+        Every nested key gets an entry, including intermediate sections,
+        e.g. "download" and "download.directory".
+        """
+        flat: Dict[str, Any] = {}
+        stack = [("", self.config)]
+        while stack:
+            prefix, node = stack.pop()
+            for k, v in list(node.items()):
+                path = f"{prefix}{k}"
+                flat[path] = v
+                if isinstance(v, dict):
+                    stack.append((f"{path}.", v))
+        return flat
+
     def set(self, key: str, value: Any) -> None:
         """
         Set a configuration value.
@@ -274,61 +371,163 @@ class ConfigManager:
             value (Any): Value to set
         """
         keys = key.split('.')
-        config = self.config
+        with self.lock:
+            config = self.config
+
+            # Navigate to the last level
+            for k in keys[:-1]:
+                if k not in config:
+                    config[k] = {}
+                config = config[k]
 
-        # Navigate to the last level
-        for k in keys[:-1]:
-            if k not in config:
-                config[k] = {}
-            config = config[k]
+            # Set the value
+            config[keys[-1]] = value
+            self.version += 1
 
-        # Set the value
-        config[keys[-1]] = value
+    def snapshot(self) -> Dict:
+        """
+        Return a deep copy of the configuration taken under ``lock``.
 
-    def save(self, config_file: str = "config.json") -> bool:
+        Returns:
+            Dict: Copy that is safe to serialize while handlers keep changing the live config
+        """
+        with self.lock:
+            return copy.deepcopy(self.config)
+
+    def save(self, config_file: Optional[str] = None) -> bool:
         """
         Save the current configuration to a file.
 
         Args:
-            config_file (str): Path to the config file
+            config_file (Optional[str]): Path to the config file (defaults to the loaded file)
 
         Returns:
             bool: True if successful, False otherwise
         """
+        with self._save_lock:
+            return self._write(self.snapshot(), config_file)
+
+    def _write(self, snapshot: Dict, config_file: Optional[str] = None) -> bool:
+        # Callers hold _save_lock, so writes of older snapshots cannot overtake newer ones
+        config_file = config_file or self.config_file
         try:
-            with open(config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=4)
+            # Serialize completely first, then write with a single write() call
+            data = json.dumps(snapshot, indent=4)
+            tmp_file = f"{config_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                f.write(data)
+                # No fsync by default: a flush costs tens of milliseconds per settings POST
+                # on journaling filesystems, and config.json can always be regenerated.
+                # Only durable_writes forces the data to disk.
+                if snapshot.get('durable_writes', False):
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_file, config_file)
             logger.info(f"Configuration saved to {config_file}")
             return True
         except Exception as e:
             logger.error(f"Error saving configuration: {str(e)}")
             return False
 
-    def get_language_priority(self) -> List[Tuple[Optional[str], Optional[str]]]:
-        """Liefert die Sprach-Prioritäten als Liste von 2-Tupeln (audio_lang, dub_lang),
-        oder den Default, wenn nichts konfiguriert ist."""
+    def save_later(self) -> None:
+        """
+        Mark the configuration as changed and let a background thread write it.
+
+        A snapshot is taken right away under ``lock``; the writer only ever writes the
+        latest one. Changes arriving within SAVE_DELAY are coalesced into one write;
+        pending changes are flushed on interpreter exit. Also bumps ``version`` so
+        values derived from the configuration are recomputed.
+        """
+        with self.lock:
+            self.version += 1
+            self._pending = copy.deepcopy(self.config)
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+                self._writer.start()
+                atexit.register(self.flush)
+        self._dirty.set()
+
+    def flush(self) -> bool:
+        """
+        Write pending changes immediately.
+
+        Returns:
+            bool: True if nothing was pending or the write succeeded
+        """
+        self._dirty.clear()
+        with self._save_lock:
+            with self.lock:
+                snapshot, self._pending = self._pending, None
+            if snapshot is None:
+                return True
+            if self._write(snapshot):
+                return True
+            # Keep the failed snapshot for the next flush unless a newer one arrived meanwhile
+            with self.lock:
+                if self._pending is None:
+                    self._pending = snapshot
+            return False
+
+    def _writer_loop(self) -> None:
+        while True:
+            self._dirty.wait()
+            time.sleep(self.SAVE_DELAY)
+            self.flush()
+
+    def _cached_derived(self, name: str, factory):
+        """Return a value derived from the configuration, recomputed only after changes."""
+        cached = self._derived.get(name)
+        if cached is not None and cached[0] == self.version:
+            return cached[1]
+        value = factory()
+        self._derived[name] = (self.version, value)
+        return value
+
+    def get_language_prefer(self) -> Tuple[str, ...]:
+        """Return the preferred language tags, normalized to lower case, as a tuple."""
+        return self._cached_derived(
+            "language_prefer",
+            lambda: tuple(str(tag).lower() for tag in (self.get("language.prefer") or ("de", "deu", "ger")))
+        )
+
+    def get_language_priority(self) -> Tuple[Tuple[Optional[str], Optional[str]], ...]:
+        """Return the language priorities as an immutable tuple of (audio_lang, dub_lang) pairs,
+        or the default when nothing usable is configured. Rebuilt only after changes."""
+        return self._cached_derived("language_priority", self._build_language_priority)
+
+    def _build_language_priority(self) -> Tuple[Tuple[Optional[str], Optional[str]], ...]:
         try:
             enabled = self.get("language_priority.enabled", True)
             pr = self.get("language_priority.priorities", None)
             if enabled and pr and all(isinstance(x, (list, tuple)) and len(x) == 2 for x in pr):
-                out: List[Tuple[Optional[str], Optional[str]]] = []
-                for a, d in pr:
-                    audio = str(a).lower() if a is not None else None
-                    dub = str(d).lower() if d is not None else None
-                    out.append((audio, dub))
-                return out
+                return tuple(
+                    (str(a).lower() if a is not None else None, str(d).lower() if d is not None else None)
+                    for a, d in pr
+                )
         except Exception:
             pass
 
         # Fallback entspricht deinem Default
-        return [
-            ("de", None),
-            ("en", "de"),
-            ("ja", "de"),
-            ("ja", "en"),
-            ("ja", None),
-            ("en", None),
-        ]
+        return _DEFAULT_LANGUAGE_PRIORITY
+
+    def get_language_priority_index(self) -> Mapping[Optional[str], Mapping[Optional[str], int]]:
+        """Return the language priorities grouped by audio language as {audio_lang: {dub_lang: rank}},
+        so a candidate is ranked with a hash lookup instead of a scan over the list."""
+        return self._cached_derived("language_priority_index", self._build_language_priority_index)
+
+    def _build_language_priority_index(self) -> Mapping[Optional[str], Mapping[Optional[str], int]]:
+        return build_language_priority_index(self.get_language_priority())
+
+
+def build_language_priority_index(
+    priorities: Tuple[Tuple[Optional[str], Optional[str]], ...]
+) -> Mapping[Optional[str], Mapping[Optional[str], int]]:
+    """Group (audio_lang, dub_lang) pairs by audio language; for duplicates the first rank wins."""
+    index: Dict[Optional[str], Dict[Optional[str], int]] = {}
+    for rank, (audio, dub) in enumerate(priorities):
+        index.setdefault(audio, {}).setdefault(dub, rank)
+    return MappingProxyType({audio: MappingProxyType(dubs) for audio, dubs in index.items()})
 
 
 # Singleton instance
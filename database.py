@@ -3,16 +3,57 @@ Datenbank-Modul für die Verwaltung von vorhandenen Serien und Animes.
 """
 
 import os
+import re
+import atexit
 import logging
 import sqlite3
 import json
-from typing import List, Dict, Any, Optional, Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterator, List, Dict, Any, Optional, Tuple
 from datetime import datetime
 
 from language_utils import language_codes_from_filename, subtitle_codes_from_filename
 
 logger = logging.getLogger(__name__)
 
+# Für Verzeichnisnamen ungültige Zeichen werden in einem Durchlauf durch '-' ersetzt
+_INVALID_NAME_CHARS = str.maketrans({char: '-' for char in '<>:"/\\|?*'})
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Bits der Spalte episodes.flags
+EPISODE_FLAG_GERMAN_DUB = 1
+EPISODE_FLAG_GERMAN_SUB = 2
+
+
+def episode_flags(has_german_dub: bool, has_german_sub: bool) -> int:
+    """Packe die Sprachmerkmale einer Episode in den Wert der Spalte flags."""
+    return (EPISODE_FLAG_GERMAN_DUB if has_german_dub else 0) | (EPISODE_FLAG_GERMAN_SUB if has_german_sub else 0)
+
+
+def _episode_dict(row) -> Dict[str, Any]:
+    """Episodenzeile als Dict, mit has_german_dub/has_german_sub aus flags für die bisherigen Aufrufer."""
+    episode = dict(row)
+    flags = episode.get('flags') or 0
+    episode['has_german_dub'] = bool(flags & EPISODE_FLAG_GERMAN_DUB)
+    episode['has_german_sub'] = bool(flags & EPISODE_FLAG_GERMAN_SUB)
+    return episode
+
+
+# Episodendateien: "S01E01 - Titel [GerDub].mp4"; der Titel endet vor dem ersten " [" bzw. der Dateiendung
+_EPISODE_FILENAME_RE = re.compile(
+    r'^(?:S\d+E(?P<episode>\d+))?.*?(?: - (?P<title>.*?))?(?: \[.*)?\.\w+$',
+    re.IGNORECASE | re.DOTALL
+)
+
+
+def _parse_episode_filename(filename: str) -> Tuple[int, str]:
+    """Liefert Episodennummer und Titel aus einem Dateinamen; ohne SxxEyy ist die Nummer 0."""
+    match = _EPISODE_FILENAME_RE.match(filename)
+    if match is None:
+        return 0, ""
+    return int(match['episode']) if match['episode'] else 0, match['title'] or ""
+
 class MediaDatabase:
     """Datenbank für die Verwaltung von vorhandenen Serien und Animes."""
 
@@ -24,25 +65,85 @@ class MediaDatabase:
             db_path (str): Pfad zur Datenbank-Datei
         """
         self.db_path = db_path
+        # Serialisiert die Schreibphasen von Scans, Stapel-Updates und das Zurücksetzen der Datenbank
+        self._write_lock = threading.Lock()
+        # Wird von clear_all erhöht; ein Scan, dessen Manifest davor geladen wurde, ist damit veraltet
+        self._clear_generation = 0
+        # Eine dauerhafte Verbindung pro Thread statt connect/close bei jedem Aufruf
+        self._local = threading.local()
+        self._connections: Dict[threading.Thread, sqlite3.Connection] = {}
+        self._connections_lock = threading.Lock()
+        atexit.register(self.close_all)
         self._create_tables()
 
+    _STATS_TRIGGERS = (
+        '''CREATE TRIGGER IF NOT EXISTS episodes_stats_ai AFTER INSERT ON episodes BEGIN
+            UPDATE stats_counters SET value = value + 1 WHERE key = 'episode_count';
+            UPDATE stats_counters SET value = value + COALESCE(NEW.file_size, 0) WHERE key = 'total_size';
+        END''',
+        '''CREATE TRIGGER IF NOT EXISTS episodes_stats_ad AFTER DELETE ON episodes BEGIN
+            UPDATE stats_counters SET value = value - 1 WHERE key = 'episode_count';
+            UPDATE stats_counters SET value = value - COALESCE(OLD.file_size, 0) WHERE key = 'total_size';
+        END''',
+        '''CREATE TRIGGER IF NOT EXISTS episodes_stats_au AFTER UPDATE OF file_size ON episodes BEGIN
+            UPDATE stats_counters SET value = value - COALESCE(OLD.file_size, 0) + COALESCE(NEW.file_size, 0)
+            WHERE key = 'total_size';
+        END''',
+    )
+
     def _get_connection(self) -> sqlite3.Connection:
         """
-        Erstelle eine robuste Datenbankverbindung mit WAL-Modus und Timeouts.
+        Liefere die Datenbankverbindung des aktuellen Threads.
+
+        Die Verbindung wird beim ersten Zugriff eines Threads geöffnet, mit WAL-Modus und Timeouts
+        eingerichtet und danach wiederverwendet; sie wird von den Aufrufern nicht geschlossen.
 
         Returns:
             sqlite3.Connection: Datenbankverbindung
         """
-        conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn
+
+        # Größerer Statement-Cache, damit die Scan- und Upsert-Statements nicht erneut geparst werden
+        conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False, cached_statements=256)
         cursor = conn.cursor()
 
         # Aktiviere WAL-Modus für bessere Robustheit
         cursor.execute("PRAGMA journal_mode=WAL;")
         cursor.execute("PRAGMA synchronous=NORMAL;")
         cursor.execute("PRAGMA busy_timeout=5000;")
+        # Damit auch INSERT OR REPLACE die DELETE-Trigger der Statistikzähler auslöst
+        cursor.execute("PRAGMA recursive_triggers=ON;")
+        # Größerer Seiten-Cache (64 MB) und mmap (256 MB), da die Verbindung dauerhaft offen bleibt
+        cursor.execute("PRAGMA cache_size=-65536;")
+        cursor.execute("PRAGMA temp_store=MEMORY;")
+        cursor.execute("PRAGMA mmap_size=268435456;")
+        # ON DELETE CASCADE der Staffeln und Episoden greift nur mit aktivierten Fremdschlüsseln
+        cursor.execute("PRAGMA foreign_keys=ON;")
+        cursor.close()
+
+        self._local.conn = conn
+        with self._connections_lock:
+            # Verbindungen beendeter Threads (z. B. Scan-Worker) schließen
+            for thread in [t for t in self._connections if not t.is_alive()]:
+                self._connections.pop(thread).close()
+            self._connections[threading.current_thread()] = conn
 
         return conn
 
+    def close_all(self) -> None:
+        """Schließe die Verbindungen aller Threads (wird beim Beenden des Prozesses aufgerufen)."""
+        with self._connections_lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
     def _create_tables(self) -> None:
         """Erstelle die benötigten Tabellen, falls sie nicht existieren."""
         conn = self._get_connection()
@@ -90,8 +191,7 @@ class MediaDatabase:
             filename TEXT NOT NULL,
             file_path TEXT NOT NULL,
             file_size INTEGER,
-            has_german_dub BOOLEAN DEFAULT 0,
-            has_german_sub BOOLEAN DEFAULT 0,
+            flags INTEGER NOT NULL DEFAULT 0,
             summary TEXT,
             plot_points TEXT,
             ai_enhanced BOOLEAN DEFAULT 0,
@@ -101,8 +201,95 @@ class MediaDatabase:
         )
         ''')
 
+        # Ältere Datenbanken: deutsche Synchronisation/Untertitel aus zwei Spalten in flags übernehmen.
+        # Spalte anlegen, befüllen und alte Spalten entfernen in einer Transaktion, damit ein Abbruch
+        # dazwischen keine angelegte, aber leere flags-Spalte hinterlässt
+        cursor.execute("PRAGMA table_info(episodes)")
+        episode_columns = {column[1] for column in cursor.fetchall()}
+        if 'flags' not in episode_columns:
+            conn.commit()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                cursor.execute("ALTER TABLE episodes ADD COLUMN flags INTEGER NOT NULL DEFAULT 0")
+                cursor.execute(
+                    "UPDATE episodes SET flags = (CASE WHEN has_german_dub THEN ? ELSE 0 END) "
+                    "| (CASE WHEN has_german_sub THEN ? ELSE 0 END)",
+                    (EPISODE_FLAG_GERMAN_DUB, EPISODE_FLAG_GERMAN_SUB)
+                )
+                # DROP COLUMN gibt es erst ab SQLite 3.35; ältere Versionen behalten die ungenutzten Spalten
+                if sqlite3.sqlite_version_info >= (3, 35, 0):
+                    cursor.execute("ALTER TABLE episodes DROP COLUMN has_german_dub")
+                    cursor.execute("ALTER TABLE episodes DROP COLUMN has_german_sub")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+        # Index für Statistiken nach Medientyp
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_media_type ON media (type)")
+        # Listen sortieren nach Titel; Staffeln nach media_id und Episoden nach season_id
+        # sind bereits über die UNIQUE-Indizes (media_id, season_number) bzw. (season_id, episode_number) abgedeckt
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_media_title ON media (title)")
+
+        # Stand der zuletzt gescannten Episodendateien, damit erneute Scans unveränderte Dateien überspringen
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS file_manifest (
+            path TEXT PRIMARY KEY,
+            mtime_ns INTEGER NOT NULL,
+            size INTEGER NOT NULL
+        )
+        ''')
+
+        # Laufende Zähler für Episodenanzahl und Gesamtgröße, gepflegt über Trigger
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS stats_counters (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
+        )
+        ''')
+        # Beim ersten Anlegen aus dem vorhandenen Bestand befüllen
+        cursor.execute("INSERT OR IGNORE INTO stats_counters (key, value) SELECT 'episode_count', COUNT(*) FROM episodes")
+        cursor.execute("INSERT OR IGNORE INTO stats_counters (key, value) SELECT 'total_size', COALESCE(SUM(file_size), 0) FROM episodes")
+        for statement in self._STATS_TRIGGERS:
+            cursor.execute(statement)
+
         conn.commit()
-        conn.close()
+
+        # Statistiken für den Query-Planer einmal beim Start auffrischen, begrenzt auf eine Stichprobe pro Index
+        cursor.execute("PRAGMA analysis_limit=1000")
+        cursor.execute("ANALYZE")
+        conn.commit()
+
+        # Spaltennamen je Tabelle, um die Zeilen von JOIN-Abfragen über mehrere Tabellen aufzuteilen
+        self._columns: Dict[str, Tuple[str, ...]] = {}
+        for table in ('media', 'seasons', 'episodes'):
+            cursor.execute(f"PRAGMA table_info({table})")
+            self._columns[table] = tuple(column[1] for column in cursor.fetchall())
+
+    # Upsert statt REPLACE: ID und KI-Metadaten bleiben bei erneuten Scans erhalten
+    _UPSERT_MEDIA_SQL = """INSERT INTO media (title, type, url, directory, last_updated) VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT(url) DO UPDATE SET title = excluded.title, type = excluded.type,
+                   directory = excluded.directory, last_updated = excluded.last_updated"""
+
+    # Upsert statt REPLACE: die Staffel-ID bleibt stabil, ihre Episoden bleiben zugeordnet
+    _UPSERT_SEASON_SQL = """INSERT INTO seasons (media_id, season_number, directory, last_updated) VALUES (?, ?, ?, ?)
+                   ON CONFLICT(media_id, season_number) DO UPDATE SET
+                   directory = excluded.directory, last_updated = excluded.last_updated"""
+
+    _INSERT_EPISODE_SQL = """INSERT OR REPLACE INTO episodes
+                   (season_id, episode_number, title, filename, file_path, file_size,
+                    flags, download_date)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)"""
+
+    _UPDATE_EPISODE_FILE_SQL = "UPDATE episodes SET filename = ?, file_path = ?, file_size = ?, flags = ? WHERE id = ?"
+
+    _SELECT_MEDIA_ID_SQL = "SELECT id FROM media WHERE url = ?"
+    _SELECT_SEASON_ID_SQL = "SELECT id FROM seasons WHERE media_id = ? AND season_number = ?"
+    _SELECT_SEASON_IDS_SQL = "SELECT season_number, id FROM seasons WHERE media_id = ?"
+    _SELECT_EPISODE_IDS_SQL = "SELECT episode_number, id FROM episodes WHERE season_id = ?"
+
+    _UPSERT_MANIFEST_SQL = "INSERT OR REPLACE INTO file_manifest (path, mtime_ns, size) VALUES (?, ?, ?)"
+    _DELETE_MANIFEST_SQL = "DELETE FROM file_manifest WHERE path = ?"
 
     def add_media(self, title: str, media_type: str, url: str, directory: str) -> int:
         """
@@ -121,19 +308,15 @@ class MediaDatabase:
         cursor = conn.cursor()
 
         try:
-            cursor.execute(
-                "INSERT OR REPLACE INTO media (title, type, url, directory, last_updated) VALUES (?, ?, ?, ?, ?)",
-                (title, media_type, url, directory, datetime.now())
-            )
-            media_id = cursor.lastrowid
+            cursor.execute(self._UPSERT_MEDIA_SQL, (title, media_type, url, directory, datetime.now()))
+            cursor.execute(self._SELECT_MEDIA_ID_SQL, (url,))
+            media_id = cursor.fetchone()[0]
             conn.commit()
             return media_id
         except Exception as e:
             logger.error(f"Fehler beim Hinzufügen von {title}: {str(e)}")
             conn.rollback()
             return -1
-        finally:
-            conn.close()
 
     def add_season(self, media_id: int, season_number: int, directory: str) -> int:
         """
@@ -151,19 +334,15 @@ class MediaDatabase:
         cursor = conn.cursor()
 
         try:
-            cursor.execute(
-                "INSERT OR REPLACE INTO seasons (media_id, season_number, directory, last_updated) VALUES (?, ?, ?, ?)",
-                (media_id, season_number, directory, datetime.now())
-            )
-            season_id = cursor.lastrowid
+            cursor.execute(self._UPSERT_SEASON_SQL, (media_id, season_number, directory, datetime.now()))
+            cursor.execute(self._SELECT_SEASON_ID_SQL, (media_id, season_number))
+            season_id = cursor.fetchone()[0]
             conn.commit()
             return season_id
         except Exception as e:
             logger.error(f"Fehler beim Hinzufügen von Staffel {season_number}: {str(e)}")
             conn.rollback()
             return -1
-        finally:
-            conn.close()
 
     def add_episode(self, season_id: int, episode_number: int, title: str, filename: str,
                    file_path: str, file_size: int = 0, has_german_dub: bool = False,
@@ -189,12 +368,9 @@ class MediaDatabase:
 
         try:
             cursor.execute(
-                """INSERT OR REPLACE INTO episodes
-                   (season_id, episode_number, title, filename, file_path, file_size,
-                    has_german_dub, has_german_sub, download_date)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                self._INSERT_EPISODE_SQL,
                 (season_id, episode_number, title, filename, file_path, file_size,
-                 has_german_dub, has_german_sub, datetime.now())
+                 episode_flags(has_german_dub, has_german_sub), datetime.now())
             )
             episode_id = cursor.lastrowid
             conn.commit()
@@ -203,8 +379,6 @@ class MediaDatabase:
             logger.error(f"Fehler beim Hinzufügen von Episode {episode_number}: {str(e)}")
             conn.rollback()
             return -1
-        finally:
-            conn.close()
 
     def get_media_by_url(self, url: str) -> Optional[Dict[str, Any]]:
         """
@@ -217,14 +391,12 @@ class MediaDatabase:
             Optional[Dict[str, Any]]: Informationen zur Serie/zum Anime oder None
         """
         conn = self._get_connection()
-        conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
 
         cursor.execute("SELECT * FROM media WHERE url = ?", (url,))
         result = cursor.fetchone()
 
-        conn.close()
-
         if result:
             return dict(result)
         return None
@@ -240,14 +412,12 @@ class MediaDatabase:
             Optional[Dict[str, Any]]: Informationen zur Serie/zum Anime oder None
         """
         conn = self._get_connection()
-        conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
 
         cursor.execute("SELECT * FROM media WHERE id = ?", (media_id,))
         result = cursor.fetchone()
 
-        conn.close()
-
         if result:
             return dict(result)
         return None
@@ -263,14 +433,12 @@ class MediaDatabase:
             Optional[Dict[str, Any]]: Informationen zur Staffel oder None
         """
         conn = self._get_connection()
-        conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
 
         cursor.execute("SELECT * FROM seasons WHERE id = ?", (season_id,))
         result = cursor.fetchone()
 
-        conn.close()
-
         if result:
             return dict(result)
         return None
@@ -286,16 +454,14 @@ class MediaDatabase:
             Optional[Dict[str, Any]]: Informationen zur Episode oder None
         """
         conn = self._get_connection()
-        conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
 
         cursor.execute("SELECT * FROM episodes WHERE id = ?", (episode_id,))
         result = cursor.fetchone()
 
-        conn.close()
-
         if result:
-            return dict(result)
+            return _episode_dict(result)
         return None
 
     def get_seasons_by_media_id(self, media_id: int) -> List[Dict[str, Any]]:
@@ -309,14 +475,12 @@ class MediaDatabase:
             List[Dict[str, Any]]: Liste der Staffeln
         """
         conn = self._get_connection()
-        conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
 
         cursor.execute("SELECT * FROM seasons WHERE media_id = ? ORDER BY season_number", (media_id,))
         results = cursor.fetchall()
 
-        conn.close()
-
         return [dict(row) for row in results]
 
     def get_episodes_by_season_id(self, season_id: int) -> List[Dict[str, Any]]:
@@ -330,15 +494,43 @@ class MediaDatabase:
             List[Dict[str, Any]]: Liste der Episoden
         """
         conn = self._get_connection()
-        conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
 
         cursor.execute("SELECT * FROM episodes WHERE season_id = ? ORDER BY episode_number", (season_id,))
         results = cursor.fetchall()
 
-        conn.close()
+        return [_episode_dict(row) for row in results]
 
-        return [dict(row) for row in results]
+    def get_episodes_for_seasons(self, season_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Hole die Episoden mehrerer Staffeln mit einer einzigen Abfrage.
+
+        Args:
+            season_ids (List[int]): IDs der Staffeln
+
+        Returns:
+            Dict[int, List[Dict[str, Any]]]: Episoden gruppiert nach Staffel-ID
+        """
+        grouped: Dict[int, List[Dict[str, Any]]] = {season_id: [] for season_id in season_ids}
+        if not season_ids:
+            return grouped
+
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
+
+        placeholders = ', '.join('?' for _ in season_ids)
+        cursor.execute(
+            f"SELECT * FROM episodes WHERE season_id IN ({placeholders}) ORDER BY season_id, episode_number",
+            list(season_ids)
+        )
+        results = cursor.fetchall()
+
+        for row in results:
+            grouped[row['season_id']].append(_episode_dict(row))
+
+        return grouped
 
     def get_episode_by_season_and_number(self, season_id: int, episode_number: int) -> Optional[Dict[str, Any]]:
         """
@@ -352,183 +544,353 @@ class MediaDatabase:
             Optional[Dict[str, Any]]: Informationen zur Episode oder None
         """
         conn = self._get_connection()
-        conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
 
         cursor.execute("SELECT * FROM episodes WHERE season_id = ? AND episode_number = ?",
                        (season_id, episode_number))
         result = cursor.fetchone()
 
-        conn.close()
-
         if result:
-            return dict(result)
+            return _episode_dict(result)
         return None
 
     def _sanitize_directory_name(self, directory_name: str) -> str:
         """Sanitize directory name by replacing invalid characters with hyphens."""
-        # Remove or replace common website suffixes
-        directory_name = directory_name.replace('\n', ' ').replace('\r', ' ')
-        directory_name = ' '.join(directory_name.split())  # Replace multiple spaces with single space
-
-        # Replace invalid characters with hyphens
-        invalid_chars = r'<>:"/\\|?*'
-        for char in invalid_chars:
-            directory_name = directory_name.replace(char, '-')
-
-        directory_name = directory_name.strip()
+        # Ungültige Zeichen ersetzen und Leerraum (inkl. Zeilenumbrüchen) zu einem Leerzeichen zusammenfassen
+        directory_name = _WHITESPACE_RE.sub(' ', directory_name.translate(_INVALID_NAME_CHARS)).strip()
 
         # Ensure directory name is not too long (Windows has a 255 char limit for full path)
-        if len(directory_name) > 240:  # Leave some room for path
-            directory_name = directory_name[:240]
+        return directory_name[:240]  # Leave some room for path
 
-        return directory_name
-
-    def scan_directory(self, base_dir: str) -> Tuple[int, int, int]:
+    def scan_directory(self, base_dir: str, cancel_event: Optional[threading.Event] = None,
+                       parallelism: Optional[int] = None, sort_by_inode: bool = False) -> Tuple[int, int, int]:
         """
         Scanne ein Verzeichnis nach vorhandenen Serien/Animes und füge sie zur Datenbank hinzu.
 
+        Die Serien-/Anime-Verzeichnisse und ihre Staffeln werden parallel in einem Thread-Pool durchsucht;
+        die Ergebnisse schreibt anschließend der aufrufende Thread in einer einzigen Transaktion.
+
         Args:
             base_dir (str): Basisverzeichnis, in dem nach Serien/Animes gesucht werden soll
+            cancel_event (Optional[threading.Event]): Wenn gesetzt, wird der Scan nach der aktuellen Staffel beendet
+            parallelism (Optional[int]): Anzahl paralleler Worker (Standard: min(32, 4 * CPU-Kerne))
+            sort_by_inode (bool): Verzeichniseinträge nach Inode sortieren (weniger Kopfbewegungen auf HDDs)
 
         Returns:
             Tuple[int, int, int]: Anzahl der gefundenen Serien/Animes, Staffeln und Episoden
         """
-        if not os.path.exists(base_dir):
+        # Ein scandir des Basisverzeichnisses ersetzt die isdir()-Prüfungen für Serien/ und Animes/
+        try:
+            base_entries = {entry.name: entry for entry in self._list_directory(base_dir)}
+        except (FileNotFoundError, NotADirectoryError):
             logger.error(f"Verzeichnis {base_dir} existiert nicht")
             return 0, 0, 0
 
-        # Erstelle eine Datenbankverbindung
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        if parallelism is None:
+            # Die Worker warten überwiegend auf readdir/stat, daher mehr Threads als Kerne
+            parallelism = min(32, (os.cpu_count() or 1) * 4)
+        parallelism = max(1, int(parallelism))
+
+        def cancelled() -> bool:
+            return cancel_event is not None and cancel_event.is_set()
+
+        # Sammle die Serien-/Anime-Verzeichnisse der obersten Ebene
+        # os.scandir liefert Typ und stat-Daten direkt aus readdir, ohne extra stat() pro Eintrag
+        media_dirs: List[Tuple[str, str, str]] = []
+        for media_type_dir, media_type in (('Serien', 'series'), ('Animes', 'anime')):
+            media_type_entry = base_entries.get(media_type_dir)
+            if media_type_entry is None or not media_type_entry.is_dir():
+                continue
+
+            for media_entry in self._list_directory(media_type_entry.path, sort_by_inode):
+                if media_entry.is_dir():
+                    media_dirs.append((media_type, media_entry.name, media_entry.path))
 
         media_count = 0
         season_count = 0
         episode_count = 0
 
-        # Durchsuche das Basisverzeichnis nach Serien und Animes
-        for media_type_dir in ['Serien', 'Animes']:
-            media_type_path = os.path.join(base_dir, media_type_dir)
-            if not os.path.exists(media_type_path):
+        # Manifest des letzten Scans; die Worker lesen es nur und melden gesehene Pfade zurück
+        with self._write_lock:
+            manifest = self._load_manifest()
+            generation = self._clear_generation
+        seen_paths: set = set()
+
+        # Die Worker lesen nur das Dateisystem, geschrieben wird danach gesammelt.
+        # Der Schreib-Lock wird dabei nicht gehalten, damit Stapel-Updates und clear_all nicht auf den Scan warten
+        scanned: List[Dict[str, Any]] = []
+        with ThreadPoolExecutor(max_workers=parallelism) as executor:
+            media_futures = [
+                executor.submit(self._collect_media_dir, media_type, media_name, media_dir,
+                                cancelled, sort_by_inode)
+                for media_type, media_name, media_dir in media_dirs
+            ]
+            # Jede Staffel wird als eigene Aufgabe durchsucht, damit große Serien die Last verteilen
+            season_futures = []
+            for future in as_completed(media_futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"Fehler beim Scannen eines Verzeichnisses: {str(e)}")
+                    continue
+                if result is None:
+                    continue
+                scanned.append(result)
+                season_futures.extend(
+                    executor.submit(self._collect_season_dir, season, cancelled, sort_by_inode,
+                                    manifest, seen_paths)
+                    for season in result['seasons']
+                )
+            for future in as_completed(season_futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f"Fehler beim Scannen einer Staffel: {str(e)}")
+
+        # Manifesteinträge verschwundener Dateien unterhalb von base_dir entfernen
+        stale_paths: List[str] = []
+        if cancelled():
+            logger.info(f"Scan von {base_dir} abgebrochen")
+        else:
+            prefix = os.path.join(base_dir, '')
+            stale_paths = [path for path in manifest if path.startswith(prefix) and path not in seen_paths]
+
+        with self._write_lock:
+            # Unveränderte Dateien wurden anhand des alten Manifests übersprungen; wurde die
+            # Datenbank inzwischen geleert, fehlen sie dort und der Scan muss neu laufen
+            if self._clear_generation != generation:
+                restart = True
+            else:
+                restart = False
+                # Ein einziger Commit für den ganzen Scan statt einer Transaktion pro Verzeichnis
+                conn = self._get_connection()
+                cursor = conn.cursor()
+                try:
+                    cursor.execute("BEGIN IMMEDIATE")
+                    now = datetime.now()
+                    for media in scanned:
+                        found_seasons, found_episodes = self._write_scanned_media(cursor, media, now)
+                        media_count += 1
+                        season_count += found_seasons
+                        episode_count += found_episodes
+                    if stale_paths:
+                        cursor.executemany(self._DELETE_MANIFEST_SQL, [(path,) for path in stale_paths])
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+
+        if restart:
+            logger.info(f"Datenbank wurde während des Scans von {base_dir} geleert, Scan wird wiederholt")
+            return self.scan_directory(base_dir, cancel_event, parallelism, sort_by_inode)
+
+        logger.info(f"Scan abgeschlossen: {media_count} Serien/Animes, {season_count} Staffeln, {episode_count} Episoden gefunden")
+        return media_count, season_count, episode_count
+
+    def _load_manifest(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Lade den Datei-Manifest des letzten Scans.
+
+        Returns:
+            Dict[str, Tuple[int, int]]: Dateipfad -> (mtime_ns, Größe)
+        """
+        cursor = self._get_connection().cursor()
+        cursor.execute("SELECT path, mtime_ns, size FROM file_manifest")
+        return {path: (mtime_ns, size) for path, mtime_ns, size in cursor.fetchall()}
+
+    @staticmethod
+    def _list_directory(path: str, sort_by_inode: bool = False) -> List[os.DirEntry]:
+        """
+        Liste die Einträge eines Verzeichnisses über os.scandir auf.
+
+        Args:
+            path (str): Verzeichnis
+            sort_by_inode (bool): Einträge nach Inode sortieren, damit Folgezugriffe auf
+                rotierenden Platten möglichst sequenziell erfolgen
+
+        Returns:
+            List[os.DirEntry]: Verzeichniseinträge
+        """
+        with os.scandir(path) as it:
+            entries = list(it)
+        if sort_by_inode:
+            entries.sort(key=lambda entry: entry.inode())
+        return entries
+
+    def _collect_media_dir(self, media_type: str, media_name: str, media_dir: str,
+                           cancelled: Callable[[], bool], sort_by_inode: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Sammle die Staffelverzeichnisse einer Serie/eines Animes, ohne zu schreiben.
+
+        Die Episoden der Staffeln werden anschließend mit _collect_season_dir ermittelt.
+
+        Args:
+            media_type (str): 'series' oder 'anime'
+            media_name (str): Verzeichnisname der Serie/des Animes
+            media_dir (str): Pfad zum Verzeichnis
+            cancelled (Callable[[], bool]): Liefert True, wenn der Scan abgebrochen werden soll
+            sort_by_inode (bool): Verzeichniseinträge nach Inode sortieren
+
+        Returns:
+            Optional[Dict[str, Any]]: Serie/Anime mit (noch leeren) Staffeln, None bei Abbruch vor dem Start
+        """
+        if cancelled():
+            return None
+
+        # URL ist unbekannt, daher verwenden wir einen Platzhalter
+        # Sanitize the media name to ensure it's valid for database and future directory creation
+        sanitized_media_name = self._sanitize_directory_name(media_name)
+        seasons: List[Dict[str, Any]] = []
+
+        # Durchsuche das Verzeichnis nach Staffeln
+        for season_entry in self._list_directory(media_dir, sort_by_inode):
+            season_name = season_entry.name
+            if not season_name.lower().startswith('staffel'):
                 continue
 
-            media_type = 'series' if media_type_dir == 'Serien' else 'anime'
+            if not season_entry.is_dir():
+                continue
 
-            # Durchsuche das Verzeichnis nach Serien/Animes
-            for media_name in os.listdir(media_type_path):
-                media_dir = os.path.join(media_type_path, media_name)
-                if not os.path.isdir(media_dir):
-                    continue
+            # Extrahiere die Staffelnummer
+            try:
+                season_number = int(season_name.lower().replace('staffel', '').strip())
+            except ValueError:
+                season_number = 0
+
+            seasons.append({'number': season_number, 'directory': season_entry.path, 'episodes': [], 'unchanged': 0})
+
+        return {
+            'title': sanitized_media_name,
+            'type': media_type,
+            'url': f"local://{media_type}/{sanitized_media_name}",
+            'directory': media_dir,
+            'seasons': seasons,
+        }
+
+    def _collect_season_dir(self, season: Dict[str, Any], cancelled: Callable[[], bool],
+                            sort_by_inode: bool = False,
+                            manifest: Optional[Dict[str, Tuple[int, int]]] = None,
+                            seen_paths: Optional[set] = None) -> None:
+        """
+        Durchsuche ein Staffelverzeichnis nach Episodendateien und trage sie in season['episodes'] ein.
 
-                # Erstelle einen Eintrag für die Serie/den Anime
-                # URL ist unbekannt, daher verwenden wir einen Platzhalter
-                # Sanitize the media name to ensure it's valid for database and future directory creation
-                sanitized_media_name = self._sanitize_directory_name(media_name)
-                url_placeholder = f"local://{media_type}/{sanitized_media_name}"
-                media_id = self.add_media(sanitized_media_name, media_type, url_placeholder, media_dir)
-
-                if media_id > 0:
-                    media_count += 1
-
-                    # Durchsuche das Verzeichnis nach Staffeln
-                    for season_name in os.listdir(media_dir):
-                        if not season_name.lower().startswith('staffel'):
-                            continue
-
-                        season_dir = os.path.join(media_dir, season_name)
-                        if not os.path.isdir(season_dir):
-                            continue
-
-                        # Extrahiere die Staffelnummer
-                        try:
-                            season_number = int(season_name.lower().replace('staffel', '').strip())
-                        except ValueError:
-                            season_number = 0
-
-                        # Erstelle einen Eintrag für die Staffel
-                        season_id = self.add_season(media_id, season_number, season_dir)
-
-                        if season_id > 0:
-                            season_count += 1
-
-                            # Durchsuche das Verzeichnis nach Episoden
-                            for filename in os.listdir(season_dir):
-                                if not filename.lower().endswith(('.mp4', '.mkv', '.avi')):
-                                    continue
-
-                                file_path = os.path.join(season_dir, filename)
-                                if not os.path.isfile(file_path):
-                                    continue
-
-                                # Extrahiere die Episodennummer und den Titel
-                                episode_number = 0
-                                episode_title = ""
-
-                                # Versuche, die Episodennummer aus dem Dateinamen zu extrahieren
-                                # Format: S01E01 - Titel [GerDub].mp4
-                                if 'E' in filename:
-                                    try:
-                                        episode_part = filename.split('E')[1].split(' ')[0]
-                                        episode_number = int(episode_part)
-                                    except (IndexError, ValueError):
-                                        pass
-
-                                # Versuche, den Titel aus dem Dateinamen zu extrahieren
-                                if ' - ' in filename:
-                                    try:
-                                        # Extrahiere den Teil zwischen ' - ' und ' [' oder Ende des Dateinamens
-                                        title_part = filename.split(' - ')[1]
-                                        if ' [' in title_part:
-                                            episode_title = title_part.split(' [')[0]
-                                        else:
-                                            # Entferne die Dateiendung
-                                            episode_title = title_part.rsplit('.', 1)[0]
-                                    except IndexError:
-                                        pass
-
-                                # Prüfe, ob die Datei deutsche Synchronisation oder Untertitel hat
-                                audio_langs = language_codes_from_filename(filename)
-                                subtitle_langs = subtitle_codes_from_filename(filename)
-                                has_german_dub = 'de' in audio_langs
-                                has_german_sub = 'de' in subtitle_langs
-
-                                # Prüfe, ob bereits ein Eintrag für diese Episode existiert
-                                # (um doppelte Einträge zu vermeiden)
-                                cursor.execute(
-                                    "SELECT id FROM episodes WHERE season_id = ? AND episode_number = ?",
-                                    (season_id, episode_number)
-                                )
-                                existing_episode = cursor.fetchone()
-
-                                if existing_episode:
-                                    # Aktualisiere den bestehenden Eintrag mit dem neuesten Dateinamen
-                                    cursor.execute(
-                                        "UPDATE episodes SET filename = ?, file_path = ?, file_size = ?, "
-                                        "has_german_dub = ?, has_german_sub = ? WHERE id = ?",
-                                        (filename, file_path, file_size, has_german_dub, has_german_sub, existing_episode[0])
-                                    )
-                                    conn.commit()
-                                    logger.info(f"Episodeneintrag aktualisiert: S{season_number:02d}E{episode_number:02d} - {episode_title}")
-                                    episode_count += 1
-                                    continue
-
-                                # Dateigröße ermitteln
-                                file_size = os.path.getsize(file_path)
-
-                                # Erstelle einen Eintrag für die Episode
-                                episode_id = self.add_episode(
-                                    season_id, episode_number, episode_title, filename, file_path,
-                                    file_size, has_german_dub, has_german_sub
-                                )
-
-                                if episode_id > 0:
-                                    episode_count += 1
-
-        # Schließe die Datenbankverbindung
-        conn.close()
+        Dateien, deren Änderungszeit und Größe dem Manifest entsprechen, werden nur gezählt.
 
-        logger.info(f"Scan abgeschlossen: {media_count} Serien/Animes, {season_count} Staffeln, {episode_count} Episoden gefunden")
-        return media_count, season_count, episode_count
+        Args:
+            season (Dict[str, Any]): Staffel aus _collect_media_dir
+            cancelled (Callable[[], bool]): Liefert True, wenn der Scan abgebrochen werden soll
+            sort_by_inode (bool): Verzeichniseinträge nach Inode sortieren
+            manifest (Optional[Dict[str, Tuple[int, int]]]): Stand des letzten Scans (Pfad -> (mtime_ns, Größe))
+            seen_paths (Optional[set]): Sammelt alle gefundenen Episodenpfade
+        """
+        if cancelled():
+            return
+
+        manifest = manifest if manifest is not None else {}
+
+        # Durchsuche das Verzeichnis nach Episoden
+        for episode_entry in self._list_directory(season['directory'], sort_by_inode):
+            filename = episode_entry.name
+            if not filename.lower().endswith(('.mp4', '.mkv', '.avi')):
+                continue
+
+            if not episode_entry.is_file():
+                continue
+
+            file_path = episode_entry.path
+            # Dateigröße und Änderungszeit aus dem zwischengespeicherten stat_result
+            stat_result = episode_entry.stat()
+            file_size = stat_result.st_size
+            if seen_paths is not None:
+                seen_paths.add(file_path)
+
+            # Unveränderte Dateien sind bereits erfasst
+            if manifest.get(file_path) == (stat_result.st_mtime_ns, file_size):
+                season['unchanged'] += 1
+                continue
+
+            # Extrahiere die Episodennummer und den Titel
+            # Format: S01E01 - Titel [GerDub].mp4
+            episode_number, episode_title = _parse_episode_filename(filename)
+
+            # Prüfe, ob die Datei deutsche Synchronisation oder Untertitel hat
+            audio_langs = language_codes_from_filename(filename)
+            subtitle_langs = subtitle_codes_from_filename(filename)
+            flags = episode_flags('de' in audio_langs, 'de' in subtitle_langs)
+
+            season['episodes'].append(
+                (episode_number, episode_title, filename, file_path, file_size,
+                 stat_result.st_mtime_ns, flags)
+            )
+
+    def _write_scanned_media(self, cursor: sqlite3.Cursor, media: Dict[str, Any], now: datetime) -> Tuple[int, int]:
+        """
+        Schreibe eine von _collect_media_dir erfasste Serie/einen Anime in die laufende Transaktion.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor der Scan-Transaktion
+            media (Dict[str, Any]): Ergebnis von _collect_media_dir
+            now (datetime): Zeitstempel für last_updated/download_date
+
+        Returns:
+            Tuple[int, int]: Anzahl der Staffeln und Episoden
+        """
+        # Erstelle einen Eintrag für die Serie/den Anime
+        cursor.execute(self._UPSERT_MEDIA_SQL, (media['title'], media['type'], media['url'], media['directory'], now))
+        cursor.execute(self._SELECT_MEDIA_ID_SQL, (media['url'],))
+        media_id = cursor.fetchone()[0]
+
+        # Alle Staffeln in einem executemany anlegen und ihre IDs mit einer Abfrage nachladen
+        seasons = media['seasons']
+        cursor.executemany(
+            self._UPSERT_SEASON_SQL,
+            [(media_id, season['number'], season['directory'], now) for season in seasons]
+        )
+        cursor.execute(self._SELECT_SEASON_IDS_SQL, (media_id,))
+        season_ids = dict(cursor.fetchall())
+
+        episode_count = 0
+        changed_files: List[Tuple[str, int, int]] = []
+        for season in seasons:
+            season_id = season_ids[season['number']]
+            episode_count += season['unchanged']
+            if not season['episodes']:
+                continue
+
+            # Vorhandene Episoden der Staffel mit einer Abfrage laden (um doppelte Einträge zu vermeiden)
+            cursor.execute(self._SELECT_EPISODE_IDS_SQL, (season_id,))
+            existing_ids = dict(cursor.fetchall())
+            new_episodes: List[Tuple[Any, ...]] = []
+            updated_episodes: List[Tuple[Any, ...]] = []
+
+            for (episode_number, episode_title, filename, file_path, file_size,
+                 mtime_ns, flags) in season['episodes']:
+                existing_id = existing_ids.get(episode_number)
+                if existing_id is not None:
+                    # Aktualisiere den bestehenden Eintrag mit dem neuesten Dateinamen
+                    updated_episodes.append(
+                        (filename, file_path, file_size, flags, existing_id)
+                    )
+                    logger.info(f"Episodeneintrag aktualisiert: S{season['number']:02d}E{episode_number:02d} - {episode_title}")
+                else:
+                    new_episodes.append(
+                        (season_id, episode_number, episode_title, filename, file_path,
+                         file_size, flags, now)
+                    )
+                episode_count += 1
+                changed_files.append((file_path, mtime_ns, file_size))
+
+            # Neue und geänderte Episoden der Staffel gesammelt schreiben
+            if updated_episodes:
+                cursor.executemany(self._UPDATE_EPISODE_FILE_SQL, updated_episodes)
+            if new_episodes:
+                cursor.executemany(self._INSERT_EPISODE_SQL, new_episodes)
+
+        if changed_files:
+            cursor.executemany(self._UPSERT_MANIFEST_SQL, changed_files)
+
+        return len(seasons), episode_count
 
     def update_media_url(self, media_id: int, url: str) -> bool:
         """
@@ -555,8 +917,51 @@ class MediaDatabase:
             logger.error(f"Fehler beim Aktualisieren der URL für Media ID {media_id}: {str(e)}")
             conn.rollback()
             return False
-        finally:
-            conn.close()
+
+    @staticmethod
+    def _media_metadata_row(media_id: int, metadata: Dict[str, Any]) -> Tuple[Any, ...]:
+        """Bereite die Parameter für das UPDATE der Metadaten einer Serie/eines Animes vor."""
+        # Extrahiere die wichtigsten Felder aus den Metadaten
+        description = metadata.get('ausführliche_beschreibung') or metadata.get('kurzbeschreibung') or ''
+
+        # Konvertiere Genres-Liste in einen String
+        genres = metadata.get('genre', [])
+        if isinstance(genres, list):
+            genres_str = ', '.join(genres)
+        else:
+            genres_str = str(genres)
+
+        year = metadata.get('erscheinungsjahr', None)
+        if year and isinstance(year, str):
+            try:
+                year = int(year)
+            except ValueError:
+                year = None
+
+        rating = metadata.get('bewertung', None)
+        if rating:
+            try:
+                rating = float(rating)
+            except (ValueError, TypeError):
+                rating = None
+
+        poster_url = metadata.get('poster_url', '')
+
+        # Speichere die vollständigen Metadaten als JSON
+        metadata_json = json.dumps(metadata, ensure_ascii=False)
+
+        return (description, genres_str, year, rating, poster_url, metadata_json, datetime.now(), media_id)
+
+    _UPDATE_MEDIA_METADATA_SQL = """UPDATE media SET
+                   description = ?,
+                   genres = ?,
+                   year = ?,
+                   rating = ?,
+                   poster_url = ?,
+                   metadata_json = ?,
+                   ai_enhanced = 1,
+                   last_updated = ?
+                   WHERE id = ?"""
 
     def update_media_metadata(self, media_id: int, metadata: Dict[str, Any]) -> bool:
         """
@@ -573,56 +978,75 @@ class MediaDatabase:
         cursor = conn.cursor()
 
         try:
-            # Extrahiere die wichtigsten Felder aus den Metadaten
-            description = metadata.get('ausführliche_beschreibung') or metadata.get('kurzbeschreibung') or ''
-
-            # Konvertiere Genres-Liste in einen String
-            genres = metadata.get('genre', [])
-            if isinstance(genres, list):
-                genres_str = ', '.join(genres)
-            else:
-                genres_str = str(genres)
+            cursor.execute(self._UPDATE_MEDIA_METADATA_SQL, self._media_metadata_row(media_id, metadata))
+            conn.commit()
+            return cursor.rowcount > 0
+        except Exception as e:
+            logger.error(f"Fehler beim Aktualisieren der Metadaten für Media ID {media_id}: {str(e)}")
+            conn.rollback()
+            return False
 
-            year = metadata.get('erscheinungsjahr', None)
-            if year and isinstance(year, str):
-                try:
-                    year = int(year)
-                except ValueError:
-                    year = None
+    def update_media_metadata_batch(self, items: List[Tuple[int, Dict[str, Any]]]) -> int:
+        """
+        Aktualisiere die Metadaten mehrerer Serien/Animes in einer Transaktion.
 
-            rating = metadata.get('bewertung', None)
-            if rating:
-                try:
-                    rating = float(rating)
-                except (ValueError, TypeError):
-                    rating = None
+        Args:
+            items (List[Tuple[int, Dict[str, Any]]]): Paare aus Media-ID und Metadaten
 
-            poster_url = metadata.get('poster_url', '')
+        Returns:
+            int: Anzahl der aktualisierten Einträge (0 bei Fehler)
+        """
+        if not items:
+            return 0
 
-            # Speichere die vollständigen Metadaten als JSON
-            metadata_json = json.dumps(metadata, ensure_ascii=False)
+        conn = self._get_connection()
+        cursor = conn.cursor()
 
-            cursor.execute(
-                """UPDATE media SET
-                   description = ?,
-                   genres = ?,
-                   year = ?,
-                   rating = ?,
-                   poster_url = ?,
-                   metadata_json = ?,
-                   ai_enhanced = 1,
-                   last_updated = ?
-                   WHERE id = ?""",
-                (description, genres_str, year, rating, poster_url, metadata_json, datetime.now(), media_id)
-            )
-            conn.commit()
-            return cursor.rowcount > 0
+        try:
+            rows = [self._media_metadata_row(media_id, metadata) for media_id, metadata in items]
+            with self._write_lock:
+                cursor.executemany(self._UPDATE_MEDIA_METADATA_SQL, rows)
+                conn.commit()
+            return cursor.rowcount
         except Exception as e:
-            logger.error(f"Fehler beim Aktualisieren der Metadaten für Media ID {media_id}: {str(e)}")
+            logger.error(f"Fehler beim Aktualisieren der Metadaten für {len(items)} Medien: {str(e)}")
             conn.rollback()
-            return False
-        finally:
-            conn.close()
+            return 0
+
+    def clear_all(self) -> None:
+        """
+        Lösche alle Serien/Animes, Staffeln, Episoden und das Scan-Manifest in einer Transaktion und gib den Speicher frei.
+
+        Schema und Indizes bleiben erhalten, offene Verbindungen anderer Threads werden nicht gestört.
+        """
+        with self._write_lock:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            try:
+                cursor.execute("DELETE FROM episodes")
+                cursor.execute("DELETE FROM seasons")
+                cursor.execute("DELETE FROM media")
+                cursor.execute("DELETE FROM file_manifest")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            self._clear_generation += 1
+
+            # VACUUM darf nicht innerhalb einer Transaktion laufen und scheitert, solange andere
+            # Verbindungen lesen; die Daten sind dann trotzdem gelöscht, nur der Speicher bleibt belegt
+            try:
+                cursor.execute("VACUUM")
+            except sqlite3.Error as e:
+                logger.warning(f"VACUUM nach dem Leeren der Datenbank fehlgeschlagen: {str(e)}")
+
+        logger.info("Mediendatenbank geleert")
+
+    _UPDATE_EPISODE_METADATA_SQL = """UPDATE episodes SET
+                   summary = ?,
+                   plot_points = ?,
+                   ai_enhanced = 1
+                   WHERE id = ?"""
 
     def update_episode_metadata(self, episode_id: int, metadata: Dict[str, Any]) -> bool:
         """
@@ -648,22 +1072,13 @@ class MediaDatabase:
             else:
                 plot_points_str = str(plot_points)
 
-            cursor.execute(
-                """UPDATE episodes SET
-                   summary = ?,
-                   plot_points = ?,
-                   ai_enhanced = 1
-                   WHERE id = ?""",
-                (summary, plot_points_str, episode_id)
-            )
+            cursor.execute(self._UPDATE_EPISODE_METADATA_SQL, (summary, plot_points_str, episode_id))
             conn.commit()
             return cursor.rowcount > 0
         except Exception as e:
             logger.error(f"Fehler beim Aktualisieren der Metadaten für Episode ID {episode_id}: {str(e)}")
             conn.rollback()
             return False
-        finally:
-            conn.close()
 
     def get_all_media(self) -> List[Dict[str, Any]]:
         """
@@ -672,16 +1087,55 @@ class MediaDatabase:
         Returns:
             List[Dict[str, Any]]: Liste aller Serien und Animes
         """
-        conn = self._get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        return list(self.iter_all_media())
 
-        cursor.execute("SELECT * FROM media ORDER BY title")
-        results = cursor.fetchall()
+    def iter_all_media(self, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """
+        Liefere alle Serien und Animes nacheinander, ohne die ganze Tabelle in den Speicher zu laden.
 
-        conn.close()
+        Der Cursor bleibt geöffnet, bis der Generator erschöpft oder geschlossen ist.
 
-        return [dict(row) for row in results]
+        Args:
+            batch_size (int): Anzahl der Zeilen pro fetchmany-Aufruf
+
+        Yields:
+            Dict[str, Any]: Eine Serie/ein Anime
+        """
+        # Dicts direkt aus den Spaltennamen bauen, ohne Zwischenobjekt sqlite3.Row pro Zeile
+        columns = self._columns['media']
+        cursor = self._get_connection().cursor()
+        try:
+            cursor.execute("SELECT * FROM media ORDER BY title")
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(zip(columns, row))
+        finally:
+            cursor.close()
+
+    def get_media_needing_enhancement(self, batch_size: int = 500) -> List[Dict[str, Any]]:
+        """
+        Hole ID und Titel aller Serien/Animes, deren Metadaten noch nicht verbessert wurden.
+
+        Args:
+            batch_size (int): Anzahl der Zeilen pro fetchmany-Aufruf
+
+        Returns:
+            List[Dict[str, Any]]: Einträge mit den Schlüsseln 'id' und 'title'
+        """
+        cursor = self._get_connection().cursor()
+        cursor.execute(
+            "SELECT id, title FROM media WHERE ai_enhanced IS NULL OR ai_enhanced != 1 ORDER BY title"
+        )
+        media = []
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            media.extend({'id': row[0], 'title': row[1]} for row in rows)
+        return media
 
     def get_media_with_episodes(self) -> List[Dict[str, Any]]:
         """
@@ -690,18 +1144,60 @@ class MediaDatabase:
         Returns:
             List[Dict[str, Any]]: Liste aller Serien und Animes mit Staffeln und Episoden
         """
-        media_list = self.get_all_media()
+        return list(self.iter_media_with_episodes())
 
-        for media in media_list:
-            seasons = self.get_seasons_by_media_id(media['id'])
-            media['seasons'] = []
+    def iter_media_with_episodes(self) -> Iterator[Dict[str, Any]]:
+        """
+        Liefere alle Serien und Animes mit ihren Staffeln und Episoden nacheinander.
 
-            for season in seasons:
-                episodes = self.get_episodes_by_season_id(season['id'])
-                season['episodes'] = episodes
-                media['seasons'].append(season)
+        Eine Serie wird ausgegeben, sobald ihre letzte Zeile gelesen ist; es liegt immer nur
+        eine Serie mit ihren Staffeln und Episoden im Speicher.
 
-        return media_list
+        Yields:
+            Dict[str, Any]: Eine Serie/ein Anime mit 'seasons' und deren 'episodes'
+        """
+        media_columns = self._columns['media']
+        season_columns = self._columns['seasons']
+        episode_columns = self._columns['episodes']
+        season_start = len(media_columns)
+        episode_start = season_start + len(season_columns)
+
+        # Eine JOIN-Abfrage, deren sortierte Zeilen in einem Durchlauf gruppiert werden
+        cursor = self._get_connection().cursor()
+        try:
+            cursor.execute(
+                """SELECT m.*, s.*, e.* FROM media m
+                   LEFT JOIN seasons s ON s.media_id = m.id
+                   LEFT JOIN episodes e ON e.season_id = s.id
+                   ORDER BY m.title, m.id, s.season_number, s.id, e.episode_number"""
+            )
+
+            media: Optional[Dict[str, Any]] = None
+            season: Optional[Dict[str, Any]] = None
+            for row in cursor:
+                media_id = row[0]
+                if media is None or media['id'] != media_id:
+                    if media is not None:
+                        yield media
+                    media = dict(zip(media_columns, row[:season_start]))
+                    media['seasons'] = []
+                    season = None
+
+                season_id = row[season_start]
+                if season_id is None:
+                    continue
+                if season is None or season['id'] != season_id:
+                    season = dict(zip(season_columns, row[season_start:episode_start]))
+                    season['episodes'] = []
+                    media['seasons'].append(season)
+
+                if row[episode_start] is not None:
+                    season['episodes'].append(_episode_dict(zip(episode_columns, row[episode_start:])))
+
+            if media is not None:
+                yield media
+        finally:
+            cursor.close()
 
     def get_episode_count(self) -> int:
         """
@@ -713,13 +1209,33 @@ class MediaDatabase:
         conn = self._get_connection()
         cursor = conn.cursor()
 
-        cursor.execute("SELECT COUNT(*) FROM episodes")
-        count = cursor.fetchone()[0]
-
-        conn.close()
+        count = self._read_counters(cursor)['episode_count']
 
         return count
 
+    @staticmethod
+    def _read_counters(cursor: sqlite3.Cursor) -> Dict[str, int]:
+        # Die Trigger auf episodes halten stats_counters aktuell, ein SUM über alle Episoden entfällt
+        cursor.execute("SELECT key, value FROM stats_counters")
+        counters = {'episode_count': 0, 'total_size': 0}
+        counters.update(cursor.fetchall())
+        return counters
+
+    def get_type_counts(self) -> Dict[str, int]:
+        """
+        Ermittle die Anzahl der Serien/Animes je Typ.
+
+        Returns:
+            Dict[str, int]: Anzahl pro Typ (z.B. {'series': 10, 'anime': 5})
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT type, COUNT(*) FROM media GROUP BY type")
+        counts = {media_type: count for media_type, count in cursor.fetchall()}
+
+        return counts
+
     def get_total_size(self) -> int:
         """
         Ermittle die Gesamtgröße aller Episoden in der Datenbank.
@@ -730,13 +1246,33 @@ class MediaDatabase:
         conn = self._get_connection()
         cursor = conn.cursor()
 
-        cursor.execute("SELECT SUM(file_size) FROM episodes")
-        total_size = cursor.fetchone()[0] or 0
-
-        conn.close()
+        total_size = self._read_counters(cursor)['total_size']
 
         return total_size
 
+    def get_media_stats(self) -> Dict[str, Any]:
+        """
+        Ermittle Typ-Verteilung sowie Episodenanzahl und Gesamtgröße aus den Zählern über eine einzige Verbindung.
+
+        Returns:
+            Dict[str, Any]: {'type_counts': {...}, 'episode_count': int, 'total_size': int}
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT type, COUNT(*) FROM media GROUP BY type")
+        type_counts = {media_type: count for media_type, count in cursor.fetchall()}
+
+        counters = self._read_counters(cursor)
+        episode_count = counters['episode_count']
+        total_size = counters['total_size']
+
+        return {
+            'type_counts': type_counts,
+            'episode_count': episode_count,
+            'total_size': total_size
+        }
+
 # Singleton-Instanz
 _media_db = None
 
@@ -3,41 +3,227 @@ Gemini API Client für die Verbesserung von Metadaten und Inhaltsanalyse.
 """
 
 import os
+import time
 import logging
+import sqlite3
+import threading
 import requests
 import json
 from typing import Dict, Any, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Bei Änderungen an den Prompts erhöhen, damit alte Antworten nicht mehr verwendet werden
+CACHE_VERSION = "v1"
+CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+
+# Lebensdauer der serverseitig gecachten Prompt-Anweisungen (Gemini Context Caching)
+CONTEXT_CACHE_TTL_SECONDS = 60 * 60
+# Wartezeit nach einem vorübergehenden Fehler (Timeout, 429, 5xx) beim Anlegen eines Context Caches
+CONTEXT_CACHE_RETRY_SECONDS = 5 * 60
+
+# Feste Formatvorgaben für die Metadaten-Verbesserung; variabel ist nur der Titel
+SERIES_METADATA_INSTRUCTIONS = """
+Du lieferst detaillierte Informationen zu einer Serie/einem Anime.
+Bitte gib folgende Informationen im JSON-Format zurück:
+
+- Originaltitel
+- Alternativtitel (falls vorhanden)
+- Kurzbeschreibung (max. 200 Zeichen)
+- Ausführliche Beschreibung
+- Genre (Liste)
+- Erscheinungsjahr
+- Produktionsland
+- Sprachen
+- Bewertung (auf einer Skala von 1-10)
+- Anzahl der Staffeln (falls bekannt)
+- Anzahl der Episoden (falls bekannt)
+- Ist es ein Anime? (true/false)
+- Altersfreigabe
+
+Gib die Antwort nur als valides JSON-Objekt zurück, ohne zusätzlichen Text.
+"""
+
+
+class ResponseCache:
+    """Persistenter Cache für Gemini-Antworten (SQLite, mit Ablaufzeit)."""
+
+    def __init__(self, db_path: str = ".gemini_cache.db", ttl: int = CACHE_TTL_SECONDS):
+        """
+        Initialisiere den Cache.
+
+        Args:
+            db_path (str): Pfad zur Cache-Datenbank
+            ttl (int): Gültigkeitsdauer eines Eintrags in Sekunden
+        """
+        self.db_path = db_path
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Liefert den gecachten Wert oder None, wenn er fehlt oder abgelaufen ist."""
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            row = conn.execute(
+                "SELECT value FROM responses WHERE key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+        finally:
+            conn.close()
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return json.loads(row[0]) if row is not None else None
+
+    def set(self, key: str, value: Any) -> None:
+        """Speichert einen Wert im Cache."""
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), time.time() + self.ttl)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
 class GeminiClient:
     """Client für die Interaktion mit der Google Gemini API."""
 
-    def __init__(self, api_key: str, model: str = "gemini-1.5-pro-latest"):
+    def __init__(self, api_key: str, model: str = "gemini-1.5-pro-latest",
+                 cache_path: Optional[str] = ".gemini_cache.db"):
         """
         Initialisiere den Gemini API Client.
 
         Args:
             api_key (str): Der API-Schlüssel für die Gemini API
             model (str): Das zu verwendende Modell (Standard: gemini-1.5-pro-latest)
+            cache_path (Optional[str]): Pfad zum Antwort-Cache, None deaktiviert den Cache
         """
         self.api_key = api_key
         self.model = model
         self.base_url = "https://generativelanguage.googleapis.com/v1beta"
         self.enabled = bool(api_key)
+        self.cache: Optional[ResponseCache] = None
+        # (Modell, Anzeigename) -> (cachedContents-Name, Ablaufzeitpunkt)
+        self._context_caches: Dict[Tuple[str, str], Tuple[str, float]] = {}
+        self._context_cache_unsupported: set = set()
+        # (Modell, Anzeigename) -> frühester Zeitpunkt für den nächsten Versuch nach einem vorübergehenden Fehler
+        self._context_cache_retry_at: Dict[Tuple[str, str], float] = {}
+        # Caches, die gerade von einem Worker angelegt werden
+        self._context_cache_pending: set = set()
+        self._context_cache_lock = threading.Lock()
+
+        if cache_path:
+            try:
+                self.cache = ResponseCache(cache_path)
+            except sqlite3.Error as e:
+                logger.warning(f"Gemini-Antwort-Cache nicht verfügbar: {str(e)}")
 
         if self.enabled:
             logger.info(f"Gemini API Client initialisiert mit Modell: {model}")
         else:
             logger.warning("Gemini API Client deaktiviert (kein API-Schlüssel)")
 
-    def generate_content(self, prompt: str, max_tokens: int = 1024) -> Optional[str]:
+    def _get_context_cache(self, model: str, display_name: str, instructions: str) -> Optional[str]:
+        """
+        Liefert den Namen eines serverseitigen Context Caches für feste Prompt-Anweisungen.
+
+        Der Cache wird bei Bedarf angelegt und nach Ablauf der TTL erneuert. Lehnt die API das
+        Anlegen mit 400 ab (z. B. weil die Anweisungen unter der Mindestgröße liegen), wird für
+        dieses Modell nicht erneut versucht. Nach vorübergehenden Fehlern wird es erst nach
+        CONTEXT_CACHE_RETRY_SECONDS wieder versucht. Solange kein Cache verfügbar ist oder ein
+        anderer Worker ihn gerade anlegt, sendet der Aufrufer die Anweisungen inline.
+
+        Args:
+            model (str): Modellname
+            display_name (str): Versionierter Anzeigename des Caches
+            instructions (str): Die zu cachenden Anweisungen
+
+        Returns:
+            Optional[str]: Name des Caches (cachedContents/...) oder None
+        """
+        cache_id = (model, display_name)
+        now = time.time()
+        with self._context_cache_lock:
+            if cache_id in self._context_cache_unsupported:
+                return None
+            cached = self._context_caches.get(cache_id)
+            if cached and cached[1] > now + 60:
+                return cached[0]
+            if cache_id in self._context_cache_pending:
+                # Ein anderer Worker erneuert den Cache bereits; der alte bleibt bis zum Ablauf gültig
+                return cached[0] if cached and cached[1] > now else None
+            if self._context_cache_retry_at.get(cache_id, 0.0) > now:
+                return None
+            self._context_cache_pending.add(cache_id)
+
+        # Der Request läuft ohne Lock, damit die übrigen Worker nicht auf ihn warten
+        name = None
+        unsupported = False
+        try:
+            response = requests.post(
+                f"{self.base_url}/cachedContents?key={self.api_key}",
+                json={
+                    "model": f"models/{model}",
+                    "displayName": display_name,
+                    "systemInstruction": {"parts": [{"text": instructions}]},
+                    "ttl": f"{CONTEXT_CACHE_TTL_SECONDS}s",
+                },
+                timeout=30,
+            )
+            if response.status_code == 400:
+                unsupported = True
+                logger.info(f"Context Cache für Modell {model} nicht unterstützt, sende Anweisungen inline: {response.text[:200]}")
+            else:
+                response.raise_for_status()
+                name = response.json().get("name")
+                if not name:
+                    logger.warning(f"Antwort ohne Namen beim Anlegen des Context Caches für Modell {model}")
+        except Exception as e:
+            logger.warning(f"Context Cache für Modell {model} vorübergehend nicht verfügbar, "
+                           f"neuer Versuch in {CONTEXT_CACHE_RETRY_SECONDS} s: {str(e)}")
+
+        with self._context_cache_lock:
+            self._context_cache_pending.discard(cache_id)
+            if name:
+                self._context_caches[cache_id] = (name, time.time() + CONTEXT_CACHE_TTL_SECONDS)
+                self._context_cache_retry_at.pop(cache_id, None)
+            elif unsupported:
+                self._context_cache_unsupported.add(cache_id)
+            else:
+                self._context_cache_retry_at[cache_id] = time.time() + CONTEXT_CACHE_RETRY_SECONDS
+
+        if name:
+            logger.info(f"Context Cache {name} für Modell {model} angelegt")
+        return name
+
+    def generate_content(self, prompt: str, max_tokens: int = 1024,
+                         instructions: Optional[str] = None,
+                         instructions_name: Optional[str] = None) -> Optional[str]:
         """
         Generiere Inhalte mit der Gemini API.
 
         Args:
             prompt (str): Der Prompt für die Generierung
             max_tokens (int): Maximale Anzahl der Tokens in der Antwort
+            instructions (Optional[str]): Feste Anweisungen, die per Context Caching wiederverwendet werden
+            instructions_name (Optional[str]): Versionierter Anzeigename für den Context Cache
 
         Returns:
             Optional[str]: Die generierte Antwort oder None bei Fehler
@@ -79,11 +265,28 @@ class GeminiClient:
                     }
                 }
 
+                if instructions:
+                    cache_name = None
+                    if instructions_name:
+                        cache_name = self._get_context_cache(model, instructions_name, instructions)
+                    if cache_name:
+                        payload["cachedContent"] = cache_name
+                    else:
+                        payload["systemInstruction"] = {"parts": [{"text": instructions}]}
+
                 response = requests.post(url, json=payload)
                 response.raise_for_status()
 
                 data = response.json()
 
+                usage = data.get("usageMetadata") or {}
+                if usage:
+                    logger.debug(
+                        f"Token-Nutzung {model}: Eingabe={usage.get('promptTokenCount')}, "
+                        f"davon gecacht={usage.get('cachedContentTokenCount', 0)}, "
+                        f"Ausgabe={usage.get('candidatesTokenCount')}"
+                    )
+
                 # Extrahiere den generierten Text
                 if "candidates" in data and len(data["candidates"]) > 0:
                     candidate = data["candidates"][0]
@@ -119,30 +322,24 @@ class GeminiClient:
         if not self.enabled:
             return existing_info or {}
 
+        cache_key = f"{CACHE_VERSION}-series-meta:{self.model}:{' '.join(title.lower().split())}"
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            logger.debug(f"Gemini-Cache: {self.cache.hits} Treffer, {self.cache.misses} Fehlschläge")
+            if cached is not None:
+                logger.info(f"Metadaten für '{title}' aus dem Cache geladen")
+                return self._merge_existing_info(cached, existing_info)
+
         try:
             # Erstelle einen Prompt für die Metadaten-Verbesserung
-            prompt = f"""
-            Ich benötige detaillierte Informationen zur Serie/Anime "{title}".
-            Bitte gib mir folgende Informationen im JSON-Format zurück:
-
-            - Originaltitel
-            - Alternativtitel (falls vorhanden)
-            - Kurzbeschreibung (max. 200 Zeichen)
-            - Ausführliche Beschreibung
-            - Genre (Liste)
-            - Erscheinungsjahr
-            - Produktionsland
-            - Sprachen
-            - Bewertung (auf einer Skala von 1-10)
-            - Anzahl der Staffeln (falls bekannt)
-            - Anzahl der Episoden (falls bekannt)
-            - Ist es ein Anime? (true/false)
-            - Altersfreigabe
-
-            Gib die Antwort nur als valides JSON-Objekt zurück, ohne zusätzlichen Text.
-            """
+            # Nur der Titel ist variabel, die Formatvorgaben kommen aus dem Context Cache
+            prompt = f'Serie/Anime: "{title}"'
 
-            response = self.generate_content(prompt)
+            response = self.generate_content(
+                prompt,
+                instructions=SERIES_METADATA_INSTRUCTIONS,
+                instructions_name=f"{CACHE_VERSION}-series-meta"
+            )
 
             if not response:
                 return existing_info or {}
@@ -157,13 +354,10 @@ class GeminiClient:
                     json_str = response[json_start:json_end]
                     metadata = json.loads(json_str)
 
-                    # Füge vorhandene Informationen hinzu, wenn sie nicht in der Antwort enthalten sind
-                    if existing_info:
-                        for key, value in existing_info.items():
-                            if key not in metadata:
-                                metadata[key] = value
+                    if self.cache is not None and isinstance(metadata, dict) and metadata:
+                        self.cache.set(cache_key, metadata)
 
-                    return metadata
+                    return self._merge_existing_info(metadata, existing_info)
                 else:
                     logger.warning(f"Konnte kein JSON in der Antwort finden: {response}")
                     return existing_info or {}
@@ -177,6 +371,15 @@ class GeminiClient:
             logger.error(f"Fehler bei der Metadaten-Verbesserung: {str(e)}")
             return existing_info or {}
 
+    @staticmethod
+    def _merge_existing_info(metadata: Dict[str, Any], existing_info: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Füge vorhandene Informationen hinzu, wenn sie nicht in der Antwort enthalten sind."""
+        if existing_info:
+            for key, value in existing_info.items():
+                if key not in metadata:
+                    metadata[key] = value
+        return metadata
+
     def analyze_episode_content(self, series_title: str, episode_title: str, season_num: int, episode_num: int) -> Dict[str, Any]:
         """
         Analysiere den Inhalt einer Episode und generiere eine Zusammenfassung.
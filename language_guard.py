@@ -3,8 +3,9 @@ import subprocess
 import tempfile
 import os
 import logging
+from functools import lru_cache
 from pathlib import Path
-from config_manager import get_config
+from config_manager import build_language_priority_index, get_config
 
 # Load configuration
 config = get_config()
@@ -34,7 +35,7 @@ DEFAULT_LANG_PRIORITY = [
     ("ja", None),     # Japanisch (Original)
 ]
 
-def _get_lang_priority() -> list[tuple[str | None, str | None]]:
+def _get_lang_priority() -> tuple[tuple[str | None, str | None], ...]:
     """Holt die Sprach-Priorität robust aus:
       - ConfigManager.get_language_priority() (bevorzugt)
       - oder direkt aus 'language_priority.priorities'
@@ -44,7 +45,7 @@ def _get_lang_priority() -> list[tuple[str | None, str | None]]:
         if hasattr(config, "get_language_priority"):
             pr = config.get_language_priority()
             if pr:
-                return pr
+                return tuple(pr)
     except Exception:
         pass
 
@@ -56,11 +57,11 @@ def _get_lang_priority() -> list[tuple[str | None, str | None]]:
                 audio = str(a).lower() if a is not None else None
                 dub = str(d).lower() if d is not None else None
                 out.append((audio, dub))
-            return out
+            return tuple(out)
     except Exception:
         pass
 
-    return DEFAULT_LANG_PRIORITY
+    return tuple(DEFAULT_LANG_PRIORITY)
 
 # ------------------------ Helpers ----------------------------------------
 def _run(cmd):
@@ -111,18 +112,27 @@ def extract_wav_segment(video_path: str, out_wav: str, start: float, duration: i
     if p.returncode != 0:
         raise RuntimeError(f"ffmpeg extraction failed: {p.stderr}")
 
+# Whisper ist optional: Import und Laden des Modells passieren einmalig beim ersten Bedarf
+@lru_cache(maxsize=1)
+def _faster_whisper_model():
+    from faster_whisper import WhisperModel
+    return WhisperModel("tiny", compute_type="auto")
+
+@lru_cache(maxsize=1)
+def _openai_whisper_model():
+    import whisper
+    return whisper.load_model("tiny")
+
 def detect_lang_whisper(audio_wav_path: str):
     # Erst schnell: faster-whisper
     try:
-        from faster_whisper import WhisperModel
-        model = WhisperModel("tiny", compute_type="auto")
+        model = _faster_whisper_model()
         segments, info = model.transcribe(audio_wav_path, task="transcribe", vad_filter=True)
         return (info.language or "").lower()
     except Exception:
         # Fallback: openai-whisper
         try:
-            import whisper
-            m = whisper.load_model("tiny")
+            m = _openai_whisper_model()
             res = m.transcribe(audio_wav_path, task="transcribe", temperature=0.0, no_speech_threshold=0.7)
             return (res.get("language") or "").lower()
         except Exception as e:
@@ -212,7 +222,8 @@ def verify_language(
 ) -> tuple[bool, str, str | None]:
     """Check file language. Returns (ok, detail, fixed_path_or_none)."""
     if prefer_tags is None:
-        prefer_sequence = list(DESIRED_LANG_TAGS)
+        # Normalisiert und gecacht im ConfigManager, folgt Änderungen über die Settings-API
+        prefer_sequence = list(config.get_language_prefer())
     elif isinstance(prefer_tags, (list, tuple)):
         prefer_sequence = [str(tag).lower() for tag in prefer_tags]
     else:
@@ -399,7 +410,7 @@ def audit_and_retry_with_priority(
 
 import re
 import requests
-from typing import Iterable, List, Optional, Tuple, Dict, Any
+from typing import Callable, Iterable, List, Optional, Tuple, Dict, Any
 from models import EpisodeVariant
 
 # 1) Language Priority (Audio, Dub) - loaded from config
@@ -669,41 +680,77 @@ def normalize_variants(variants: Iterable[EpisodeVariant]) -> List[EpisodeVarian
 def pick_best(variants: Iterable[EpisodeVariant]) -> Optional[EpisodeVariant]:
     """
     Select the best variant according to configured language priority.
+    Falls back to the first variant if none matches a preference.
     """
     vs = list(variants)
-    prio = _get_lang_priority()
-    if not prio or not vs:
-        return vs[0] if vs else None
-
-    # Exact matches of priorities
-    for (a_pref, d_pref) in prio:
-        for v in vs:
-            if v.audio_lang == a_pref and v.dub_lang == d_pref:
-                return v
-
-    # Tolerance: If dub_lang unknown (None) but label suggests dub (edge cases),
-    # try fallback matches on audio_lang only:
-    for (a_pref, d_pref) in prio:
-        if d_pref is None:
-            for v in vs:
-                if v.audio_lang == a_pref:
-                    return v
-    return vs[0] if vs else None
+    if not vs:
+        return None
+    best = best_by_preference(vs)
+    return best if best is not None else vs[0]
 
-def sort_by_preference(variants: Iterable[EpisodeVariant]) -> List[EpisodeVariant]:
-    """Sort variants by language preference."""
-    lang_priority = _get_lang_priority()
+_NO_PREFERENCE_RANK = 999
+
+@lru_cache(maxsize=8)
+def _fallback_priority_index(lang_priority):
+    return build_language_priority_index(lang_priority)
+
+def _get_lang_priority_index():
+    """
+    Priority index {audio_lang: {dub_lang: rank}} from the config (cached there per config version),
+    or built from _get_lang_priority() if the config does not provide one.
+    """
+    try:
+        if hasattr(config, "get_language_priority_index"):
+            return config.get_language_priority_index()
+    except Exception:
+        pass
+    return _fallback_priority_index(_get_lang_priority())
 
+def _preference_rank(index) -> Callable[[EpisodeVariant], int]:
+    """
+    Build a rank function with O(1) lookups keyed by audio language:
+    exact (audio, dub) match -> rank, audio-only match (dub None in the priorities) -> rank + 100.
+    """
     def rank(v: EpisodeVariant) -> int:
-        for idx, (a_pref, d_pref) in enumerate(lang_priority):
-            if v.audio_lang == a_pref and v.dub_lang == d_pref:
-                return idx
+        dubs = index.get(v.audio_lang)
+        if dubs is None:
+            return _NO_PREFERENCE_RANK
+        r = dubs.get(v.dub_lang)
+        if r is not None:
+            return r
         # Second-best heuristic (audio_lang only)
-        for idx, (a_pref, d_pref) in enumerate(lang_priority):
-            if d_pref is None and v.audio_lang == a_pref:
-                return idx + 100
-        return 999
-    return sorted(variants, key=rank)
+        r = dubs.get(None)
+        return r + 100 if r is not None else _NO_PREFERENCE_RANK
+    return rank
+
+def sort_by_preference(variants: Iterable[EpisodeVariant]) -> List[EpisodeVariant]:
+    """Sort variants by language preference."""
+    return sorted(variants, key=_preference_rank(_get_lang_priority_index()))
+
+def sort_by_preference_with_best(
+    variants: Iterable[EpisodeVariant],
+) -> Tuple[Optional[EpisodeVariant], List[EpisodeVariant]]:
+    """
+    Sort variants by language preference in a single pass and return the best one with the list.
+    best is None if no variant matches any configured preference.
+    """
+    rank = _preference_rank(_get_lang_priority_index())
+    ordered = sorted(variants, key=rank)
+    best = ordered[0] if ordered and rank(ordered[0]) < _NO_PREFERENCE_RANK else None
+    return best, ordered
+
+def best_by_preference(variants: Iterable[EpisodeVariant]) -> Optional[EpisodeVariant]:
+    """
+    Return the most preferred variant in a single linear pass, without sorting.
+    Picks the same variant as sort_by_preference_with_best (None if nothing matches).
+    """
+    rank = _preference_rank(_get_lang_priority_index())
+    best, best_rank = None, _NO_PREFERENCE_RANK
+    for v in variants:
+        r = rank(v)
+        if r < best_rank:
+            best, best_rank = v, r
+    return best
 
 def pick_best_with_quality(variants: Iterable[EpisodeVariant]) -> Optional[EpisodeVariant]:
     """
@@ -1,7 +1,7 @@
 from dataclasses import dataclass, field
 from typing import Optional, List, Dict
 
-@dataclass
+@dataclass(slots=True)
 class EpisodeVariant:
     url: str
     source: str                    # z.B. "aniworld", "bs"
@@ -12,4 +12,19 @@ class EpisodeVariant:
     audio_lang: Optional[str] = None  # ISO-639-1: "de", "en", "ja"
     dub_lang: Optional[str] = None    # Falls erkennbar, z.B. "de", "en"; sonst None
     subs: List[str] = field(default_factory=list)  # ["de","en"] etc.
-    extra: Dict = field(default_factory=dict)      # beliebige Zusatzinfos
\ No newline at end of file
+    extra: Dict = field(default_factory=dict)      # beliebige Zusatzinfos
+
+    def to_dict(self) -> Dict:
+        """Flache Kopie als Dict für JSON-Antworten; schneller als dataclasses.asdict (kein deepcopy)."""
+        return {
+            "url": self.url,
+            "source": self.source,
+            "season": self.season,
+            "episode": self.episode,
+            "title": self.title,
+            "quality": self.quality,
+            "audio_lang": self.audio_lang,
+            "dub_lang": self.dub_lang,
+            "subs": list(self.subs),
+            "extra": dict(self.extra),
+        }
\ No newline at end of file
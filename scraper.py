@@ -12,6 +12,7 @@ import random
 import concurrent.futures
 import shutil
 from urllib.parse import urlparse, urljoin
+from requests.adapters import HTTPAdapter
 from datetime import datetime
 from pathlib import Path
 from bs4 import BeautifulSoup
@@ -24,6 +25,19 @@ from models import EpisodeVariant
 from language_guard import normalize_variants, verify_language, LANG_ISO_EQUIV, LANGUAGE_FALLBACK_PRIORITY
 from language_utils import rename_file_with_language_tag
 
+# Obergrenze pro Welle von Redirect-Prüfungen (Request-Timeout 10s + Puffer)
+STREAM_PROBE_TIMEOUT = 12
+
+# Parallele Fragment-Downloads für HLS/DASH-Streams (VOE liefert meist HLS)
+DOWNLOAD_FRAGMENT_CONCURRENCY = 4
+
+# Für Datei- und Verzeichnisnamen ungültige Zeichen, ersetzt in einem Durchlauf per str.translate
+_INVALID_NAME_CHARS = '<>:"/\\|?*'
+_DROP_INVALID_CHARS = str.maketrans('', '', _INVALID_NAME_CHARS)
+_HYPHEN_INVALID_CHARS = str.maketrans({char: '-' for char in _INVALID_NAME_CHARS})
+_SITE_SUFFIX_RES = (re.compile(r'\s*\|\s*AniWorld\.to.*$'), re.compile(r'\s*\|\s*S\.to.*$'))
+_WHITESPACE_RE = re.compile(r'\s+')
+
 def _resolve_ff_binary(name: str) -> str | None:
     # 1) env override
     env = os.environ.get(f"{name.upper()}_PATH")
@@ -82,6 +96,10 @@ class DownloadStatus:
         self.status_message = ""
         self._lock = threading.Lock()  # Thread-sicherer Lock für Statusaktualisierungen
         self.cancel_requested = False  # Flag für Abbruch-Anforderung
+        # Wird bei jeder Änderung erhöht; get_status baut den Snapshot nur bei neuer Version neu
+        self.version = 0
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._snapshot_version = -1
 
     def update(self, title="", progress=None, current_episode=None, total_episodes=None, status_message=""):
         """Aktualisiere den Status thread-sicher"""
@@ -96,19 +114,23 @@ class DownloadStatus:
                 self.total_episodes = total_episodes
             if status_message:
                 self.status_message = status_message
+            self.version += 1
 
     def get_status(self) -> Dict[str, Any]:
         """Hole den aktuellen Status thread-sicher"""
         with self._lock:  # Verwende den Lock beim Zugriff auf den Status
-            return {
-                'is_downloading': self.is_downloading,
-                'current_title': self.current_title,
-                'progress': self.progress,
-                'current_episode': self.current_episode,
-                'total_episodes': self.total_episodes,
-                'status_message': self.status_message,
-                'cancel_requested': self.cancel_requested
-            }
+            if self._snapshot_version != self.version:
+                self._snapshot = {
+                    'is_downloading': self.is_downloading,
+                    'current_title': self.current_title,
+                    'progress': self.progress,
+                    'current_episode': self.current_episode,
+                    'total_episodes': self.total_episodes,
+                    'status_message': self.status_message,
+                    'cancel_requested': self.cancel_requested
+                }
+                self._snapshot_version = self.version
+            return dict(self._snapshot)
 
     def start_download(self):
         """Markiere den Download als gestartet"""
@@ -117,6 +139,7 @@ class DownloadStatus:
             self.progress = 0
             self.current_episode = 0
             self.status_message = "Download gestartet"
+            self.version += 1
 
     def finish_download(self):
         """Markiere den Download als beendet"""
@@ -125,6 +148,7 @@ class DownloadStatus:
             self.progress = 100
             self.cancel_requested = False
             self.status_message = "Download abgeschlossen"
+            self.version += 1
 
     def request_cancel(self):
         """Fordert den Abbruch des Downloads an"""
@@ -132,6 +156,7 @@ class DownloadStatus:
             if self.is_downloading:
                 self.cancel_requested = True
                 self.status_message = "Abbruch angefordert..."
+                self.version += 1
                 return True
             return False
 
@@ -140,6 +165,26 @@ class DownloadStatus:
         with self._lock:
             return self.cancel_requested
 
+class _ThreadLocalSessions:
+    """Eine requests.Session pro Thread; alle teilen sich einen HTTPAdapter und damit dessen Verbindungspool.
+
+    requests.Session ist nicht als thread-safe dokumentiert (Cookies und Redirect-Zustand werden geteilt),
+    der Verbindungspool des Adapters (urllib3 PoolManager) dagegen schon.
+    """
+
+    def __init__(self, adapter: Optional[HTTPAdapter] = None):
+        self.adapter = adapter or HTTPAdapter(pool_connections=32, pool_maxsize=32)
+        self._local = threading.local()
+
+    def get(self) -> requests.Session:
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.mount('http://', self.adapter)
+            session.mount('https://', self.adapter)
+            self._local.session = session
+        return session
+
 class RealDebrid:
     def __init__(self, api_key: str):
         self.api_key = api_key
@@ -147,6 +192,9 @@ class RealDebrid:
         self.headers = {
             "Authorization": f"Bearer {self.api_key}"
         }
+        # Sessions je Thread über einen gemeinsamen Pool, damit TCP/TLS-Verbindungen wiederverwendet werden.
+        # Der API-Token wird nur bei API-Aufrufen mitgeschickt, nicht an die Download-Hosts.
+        self._sessions = _ThreadLocalSessions()
         self.is_premium = self.check_premium()
         if self.is_premium:
             logging.info("Real-Debrid Premium Account aktiv")
@@ -156,10 +204,7 @@ class RealDebrid:
     def check_premium(self) -> bool:
         """Überprüft ob der Account Premium hat"""
         try:
-            response = requests.get(
-                f"{self.base_url}/user",
-                headers=self.headers
-            )
+            response = self._sessions.get().get(f"{self.base_url}/user", headers=self.headers)
             if response.status_code == 200:
                 data = response.json()
                 return data.get("premium", 0) > 0
@@ -179,7 +224,7 @@ class RealDebrid:
                     logging.info(f"Warte {wait_time}s vor Real-Debrid Versuch {retries + 1}/{max_retries}")
                     time.sleep(wait_time)
 
-                response = requests.post(
+                response = self._sessions.get().post(
                     f"{self.base_url}/unrestrict/link",
                     headers=self.headers,
                     data={"link": link}
@@ -195,7 +240,7 @@ class RealDebrid:
                     download_url = data.get("download")
                     if download_url:
                         # Prüfe ob die Download-URL erreichbar ist
-                        head_response = requests.head(download_url, timeout=10)
+                        head_response = self._sessions.get().head(download_url, timeout=10)
                         if head_response.status_code == 200:
                             return download_url
                         logging.warning(f"Download-URL nicht erreichbar (Status: {head_response.status_code})")
@@ -336,6 +381,11 @@ class StreamScraper:
 
         # Initialisiere Session mit Browser-ähnlichen Headers
         self.session = requests.Session()
+        # Genug Verbindungen im Pool, damit parallele Redirect-Prüfungen Keep-Alive nutzen können.
+        # Aufrufe aus Worker-Threads laufen über eigene Sessions je Thread, die denselben Adapter teilen
+        self._thread_sessions = _ThreadLocalSessions()
+        self.session.mount('http://', self._thread_sessions.adapter)
+        self.session.mount('https://', self._thread_sessions.adapter)
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
@@ -402,7 +452,7 @@ class StreamScraper:
     def _find_potential_stream_links(self, episode_url: str, base_url: str) -> List[str]:
         """Findet alle potenziellen Stream-Links auf der Episode-Seite"""
         try:
-            response = self.session.get(episode_url, headers=self.session.headers, timeout=10)
+            response = self._thread_sessions.get().get(episode_url, headers=self.session.headers, timeout=10)
             soup = BeautifulSoup(response.text, 'html.parser')
 
             links = set()
@@ -453,11 +503,13 @@ class StreamScraper:
             # Parse den HTML-Inhalt
             soup = BeautifulSoup(response.text, 'html.parser')
 
-            # Finde alle Redirect-Links
+            # Finde alle Redirect-Links; dieselben Mirrors tauchen oft mehrfach auf der Seite auf
             redirects = []
+            seen_redirects = set()
             for a in soup.find_all('a', href=True):
                 href = a['href']
-                if '/redirect/' in href:
+                if '/redirect/' in href and href not in seen_redirects:
+                    seen_redirects.add(href)
                     redirects.append(href)
 
             logging.info(f"Gefundene Redirect-Links: {len(redirects)}")
@@ -465,29 +517,37 @@ class StreamScraper:
             # Verarbeite jeden Redirect und sammle die VOE-URLs
             stream_urls = []
 
-            # Verarbeite Redirects parallel
-            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_parallel_extractions) as executor:
-                future_to_redirect = {
-                    executor.submit(self._follow_redirect, redirect, base_url): redirect
-                    for redirect in redirects
-                }
+            # Verarbeite Redirects parallel; langsame Mirrors werden nach Ablauf der Frist verworfen
+            if redirects:
+                workers = max(1, self.max_parallel_extractions)
+                waves = -(-len(redirects) // workers)
+                executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+                try:
+                    future_to_redirect = {
+                        executor.submit(self._follow_redirect, redirect, base_url): redirect
+                        for redirect in redirects
+                    }
 
-                for future in concurrent.futures.as_completed(future_to_redirect):
-                    final_url = future.result()
-                    if final_url:
-                        stream_urls.append(final_url)
+                    for future in concurrent.futures.as_completed(future_to_redirect, timeout=STREAM_PROBE_TIMEOUT * waves):
+                        final_url = future.result()
+                        if final_url and final_url not in stream_urls:
+                            stream_urls.append(final_url)
+                except concurrent.futures.TimeoutError:
+                    logging.warning(f"Zeitüberschreitung bei Redirects, verwende {len(stream_urls)} bisher gefundene Streams")
+                finally:
+                    executor.shutdown(wait=False, cancel_futures=True)
 
             logging.info(f"Gefunden: {len(stream_urls)} verfügbare Streams")
 
+            # Titel einmal aus der bereits geladenen Seite lesen statt pro Stream neu anzufragen
+            title = self._extract_episode_title_from_soup(soup, episode_url)
+
             # Konvertiere URLs zu EpisodeVariant-Objekten
             variants = []
             for i, url in enumerate(stream_urls):
                 # Versuche Qualität aus URL oder Kontext zu extrahieren
                 quality = self._extract_quality_from_url(url)
 
-                # Versuche Titel aus der Seite zu extrahieren
-                title = self._extract_episode_title_from_url(episode_url)
-
                 variant = EpisodeVariant(
                     url=url,
                     source=self._extract_source_from_url(url),
@@ -524,7 +584,8 @@ class StreamScraper:
             logging.info(f"\nFolge Redirect: {redirect_url}")
 
             # Erster Redirect (von aniworld.to zu voe.sx)
-            response = self.session.get(redirect_url, allow_redirects=True, timeout=10)
+            response = self._thread_sessions.get().get(redirect_url, headers=self.session.headers,
+                                                       allow_redirects=True, timeout=10)
             voe_url = response.url
 
             # Wenn es kein VOE.sx Link ist, überspringen
@@ -560,7 +621,7 @@ class StreamScraper:
         """
         logging.info(f"Trying VOE.sx fallback downloader for: {url}")
         try:
-            fallback = VoeFallbackDownloader()
+            fallback = VoeFallbackDownloader(fragment_concurrency=DOWNLOAD_FRAGMENT_CONCURRENCY)
             filename = f"{title}.mp4"
             full_path = os.path.join(os.path.dirname(output_path), filename)
 
@@ -786,6 +847,7 @@ class StreamScraper:
                     'outtmpl': task.output_path,
                     'quiet': True,
                     'no_warnings': True,
+                    'concurrent_fragment_downloads': DOWNLOAD_FRAGMENT_CONCURRENCY,
                     'extractor_args': {'youtube': {'player_skip': ['js', 'configs', 'webpage']}},
                 }
 
@@ -870,8 +932,9 @@ class StreamScraper:
         """Make an HTTP request with retries and error handling (thread-safe)."""
         for attempt in range(retries):
             try:
-                # Thread-safe: verwende eigene Headers statt geteilte Session
-                response = requests.get(url, headers=self.session.headers, timeout=10)
+                # Thread-safe: eigene Session je Thread mit den Headers der Haupt-Session;
+                # der gemeinsame Adapter-Pool sorgt für wiederverwendete Keep-Alive-Verbindungen
+                response = self._thread_sessions.get().get(url, headers=self.session.headers, timeout=10)
                 response.raise_for_status()
                 return response
             except requests.RequestException as e:
@@ -1259,18 +1322,11 @@ class StreamScraper:
     def _sanitize_filename(self, filename: str) -> str:
         """Remove invalid characters from filename."""
         # Remove or replace common website suffixes
-        filename = re.sub(r'\s*\|\s*AniWorld\.to.*$', '', filename)
-        filename = re.sub(r'\s*\|\s*S\.to.*$', '', filename)
-
-        # Remove invalid characters
-        invalid_chars = r'<>:"/\|?*'
-        for char in invalid_chars:
-            filename = filename.replace(char, '')
+        for suffix_re in _SITE_SUFFIX_RES:
+            filename = suffix_re.sub('', filename)
 
-        # Remove or replace other problematic characters
-        filename = filename.replace('\n', ' ').replace('\r', ' ')
-        filename = re.sub(r'\s+', ' ', filename)  # Replace multiple spaces with single space
-        filename = filename.strip()
+        # Remove invalid characters, collapse whitespace (incl. line breaks) to single spaces
+        filename = _WHITESPACE_RE.sub(' ', filename.translate(_DROP_INVALID_CHARS)).strip()
 
         # Ensure filename is not too long (Windows has a 255 char limit)
         if len(filename) > 240:  # Leave some room for extension
@@ -1281,18 +1337,11 @@ class StreamScraper:
     def _sanitize_directory_name(self, directory_name: str) -> str:
         """Sanitize directory name by replacing invalid characters with hyphens."""
         # Remove or replace common website suffixes
-        directory_name = re.sub(r'\s*\|\s*AniWorld\.to.*$', '', directory_name)
-        directory_name = re.sub(r'\s*\|\s*S\.to.*$', '', directory_name)
-
-        # Replace invalid characters with hyphens
-        invalid_chars = r'<>:"/\|?*'
-        for char in invalid_chars:
-            directory_name = directory_name.replace(char, '-')
+        for suffix_re in _SITE_SUFFIX_RES:
+            directory_name = suffix_re.sub('', directory_name)
 
-        # Remove or replace other problematic characters
-        directory_name = directory_name.replace('\n', ' ').replace('\r', ' ')
-        directory_name = re.sub(r'\s+', ' ', directory_name)  # Replace multiple spaces with single space
-        directory_name = directory_name.strip()
+        # Replace invalid characters with hyphens, collapse whitespace (incl. line breaks) to single spaces
+        directory_name = _WHITESPACE_RE.sub(' ', directory_name.translate(_HYPHEN_INVALID_CHARS)).strip()
 
         # Ensure directory name is not too long (Windows has a 255 char limit for full path)
         if len(directory_name) > 240:  # Leave some room for path
@@ -1565,9 +1614,17 @@ class StreamScraper:
         try:
             # Versuche den Titel aus der Episode-Seite zu extrahieren
             response = self.make_request(episode_url)
-            if response:
-                soup = BeautifulSoup(response.text, 'html.parser')
+            soup = BeautifulSoup(response.text, 'html.parser') if response else None
+            return self._extract_episode_title_from_soup(soup, episode_url)
+        except Exception as e:
+            logging.debug(f"Fehler beim Extrahieren des Titels: {str(e)}")
 
+        return None
+
+    def _extract_episode_title_from_soup(self, soup: Optional[BeautifulSoup], episode_url: str) -> Optional[str]:
+        """Extrahiert den Episodentitel aus einer bereits geladenen Episode-Seite."""
+        try:
+            if soup is not None:
                 # Versuche verschiedene Selektoren für den Titel
                 title_selectors = [
                     'h1[itemprop="name"]',
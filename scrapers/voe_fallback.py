@@ -13,8 +13,14 @@ class VoeFallbackDownloader:
     Uses yt-dlp to download videos from VOE.sx.
     """
 
-    def __init__(self):
-        """Initialize the downloader."""
+    def __init__(self, fragment_concurrency: int = 1):
+        """
+        Initialize the downloader.
+
+        Args:
+            fragment_concurrency (int): Number of HLS/DASH fragments fetched in parallel
+        """
+        self.fragment_concurrency = max(1, fragment_concurrency)
         logging.info("VoeFallbackDownloader initialized")
 
     def download_video(
@@ -45,6 +51,7 @@ class VoeFallbackDownloader:
                 'outtmpl': output_path,
                 'quiet': False,
                 'no_warnings': False,
+                'concurrent_fragment_downloads': self.fragment_concurrency,
                 'extractor_args': {'youtube': {'player_skip': ['js', 'configs', 'webpage']}},
             }
 
@@ -70,6 +70,10 @@ const cancelButtons = Array.from(new Set(statusViews
 // Variables
 let searchTimeout = null;
 let isDownloading = false;
+let lastProgress = null;
+let lastStatus = null;
+let lastStatusVersion = null;
+let statusRequested = false;
 
 // Event Listeners
 document.addEventListener('DOMContentLoaded', () => {
@@ -156,8 +160,49 @@ document.addEventListener('DOMContentLoaded', () => {
         console.log('Connected to server');
     });
 
-    socket.on('status_update', updateStatusDisplay);
-    socket.on('download_progress', updateStatusDisplay);
+    socket.on('status_update', (status, version) => {
+        lastStatus = status ? { ...status } : null;
+        lastStatusVersion = version === undefined ? null : version;
+        statusRequested = false;
+        updateStatusDisplay(lastStatus);
+    });
+    // Nach dem vollständigen Status beim Connect kommen nur noch geänderte Felder.
+    // Passt die Basis eines Deltas nicht zum eigenen Stand, fehlt ein Delta: vollen Status neu anfordern
+    socket.on('status_update_delta', (delta) => {
+        if (!delta || !delta.patch) {
+            return;
+        }
+        if (!lastStatus || delta.base !== lastStatusVersion) {
+            if (!statusRequested) {
+                statusRequested = true;
+                socket.emit('request_status');
+            }
+            return;
+        }
+        lastStatus = Object.assign(lastStatus, delta.patch);
+        lastStatusVersion = delta.v;
+        updateStatusDisplay(lastStatus);
+    });
+    socket.on('download_progress', (payload) => {
+        lastProgress = {
+            job: payload && payload.job ? { ...payload.job } : null,
+            is_downloading: Boolean(payload && payload.is_downloading),
+        };
+        updateStatusDisplay(lastProgress);
+    });
+    // Der Server schickt nach dem ersten vollständigen Stand nur noch geänderte Felder
+    socket.on('download_progress_delta', (delta) => {
+        if (!lastProgress) {
+            lastProgress = { job: {}, is_downloading: false };
+        }
+        if (delta.job) {
+            lastProgress.job = Object.assign(lastProgress.job || {}, delta.job);
+        }
+        if (Object.prototype.hasOwnProperty.call(delta, 'is_downloading')) {
+            lastProgress.is_downloading = Boolean(delta.is_downloading);
+        }
+        updateStatusDisplay(lastProgress);
+    });
 });
 
 // Functions
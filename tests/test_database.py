@@ -0,0 +1,122 @@
+import sqlite3
+
+import pytest
+
+from database import EPISODE_FLAG_GERMAN_DUB, EPISODE_FLAG_GERMAN_SUB, MediaDatabase, _parse_episode_filename
+
+# Schema vor der Zusammenfassung der Sprachspalten in episodes.flags
+_BASELINE_SCHEMA = """
+CREATE TABLE media (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    type TEXT NOT NULL,
+    url TEXT UNIQUE NOT NULL,
+    directory TEXT NOT NULL,
+    description TEXT,
+    genres TEXT,
+    year INTEGER,
+    rating REAL,
+    poster_url TEXT,
+    metadata_json TEXT,
+    ai_enhanced BOOLEAN DEFAULT 0,
+    last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE seasons (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    media_id INTEGER NOT NULL,
+    season_number INTEGER NOT NULL,
+    directory TEXT NOT NULL,
+    last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (media_id) REFERENCES media (id) ON DELETE CASCADE,
+    UNIQUE (media_id, season_number)
+);
+CREATE TABLE episodes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    season_id INTEGER NOT NULL,
+    episode_number INTEGER NOT NULL,
+    title TEXT,
+    filename TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    file_size INTEGER,
+    has_german_dub BOOLEAN DEFAULT 0,
+    has_german_sub BOOLEAN DEFAULT 0,
+    summary TEXT,
+    plot_points TEXT,
+    ai_enhanced BOOLEAN DEFAULT 0,
+    download_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (season_id) REFERENCES seasons (id) ON DELETE CASCADE,
+    UNIQUE (season_id, episode_number)
+);
+INSERT INTO media (id, title, type, url, directory) VALUES (1, 'Show', 'series', 'local://series/Show', '/media/Show');
+INSERT INTO seasons (id, media_id, season_number, directory) VALUES (1, 1, 1, '/media/Show/Staffel 1');
+INSERT INTO episodes (season_id, episode_number, filename, file_path, file_size, has_german_dub, has_german_sub)
+VALUES (1, 1, 'a.mp4', '/a.mp4', 1, 1, 0),
+       (1, 2, 'b.mp4', '/b.mp4', 1, 0, 1),
+       (1, 3, 'c.mp4', '/c.mp4', 1, 1, 1),
+       (1, 4, 'd.mp4', '/d.mp4', 1, 0, 0);
+"""
+
+
+def _create_baseline_db(path, extra_sql: str = "") -> None:
+    conn = sqlite3.connect(path)
+    conn.executescript(_BASELINE_SCHEMA + extra_sql)
+    conn.close()
+
+
+def _episode_columns(path) -> set:
+    conn = sqlite3.connect(path)
+    try:
+        return {column[1] for column in conn.execute("PRAGMA table_info(episodes)")}
+    finally:
+        conn.close()
+
+
+def test_flags_migration_preserves_dub_and_sub(tmp_path) -> None:
+    path = str(tmp_path / "media.db")
+    _create_baseline_db(path)
+
+    db = MediaDatabase(path)
+    try:
+        episodes = {e['episode_number']: e for e in db.get_episodes_by_season_id(1)}
+        assert {n: e['flags'] for n, e in episodes.items()} == {
+            1: EPISODE_FLAG_GERMAN_DUB,
+            2: EPISODE_FLAG_GERMAN_SUB,
+            3: EPISODE_FLAG_GERMAN_DUB | EPISODE_FLAG_GERMAN_SUB,
+            4: 0,
+        }
+        assert (episodes[3]['has_german_dub'], episodes[3]['has_german_sub']) == (True, True)
+        assert (episodes[4]['has_german_dub'], episodes[4]['has_german_sub']) == (False, False)
+    finally:
+        db.close_all()
+
+    columns = _episode_columns(path)
+    assert 'flags' in columns
+    if sqlite3.sqlite_version_info >= (3, 35, 0):
+        assert not columns & {'has_german_dub', 'has_german_sub'}
+
+
+@pytest.mark.skipif(sqlite3.sqlite_version_info < (3, 35, 0), reason="DROP COLUMN erst ab SQLite 3.35")
+def test_failed_flags_migration_leaves_schema_untouched(tmp_path) -> None:
+    path = str(tmp_path / "media.db")
+    # Indizierte Spalten lassen sich nicht entfernen, die Migration scheitert also nach ADD und UPDATE
+    _create_baseline_db(path, "CREATE INDEX idx_dub ON episodes (has_german_dub);")
+
+    with pytest.raises(sqlite3.OperationalError):
+        MediaDatabase(path)
+
+    # Ohne halb angelegte flags-Spalte läuft die Migration beim nächsten Start vollständig
+    assert 'flags' not in _episode_columns(path)
+
+
+@pytest.mark.parametrize("filename, expected", [
+    ("S01E01 - Title [GerDub].mp4", (1, "Title")),
+    ("S01E01.mp4", (1, "")),
+    ("s02e13 - Title [GerSub].mkv", (13, "Title")),
+    ("S01E05 - Mr. Robot.mp4", (5, "Mr. Robot")),
+    ("S01E02 - Title.with.dots [GerDub] [1080p].mkv", (2, "Title.with.dots")),
+    ("S03E07 - Dr. Who - Part 2 [GerDub].mp4", (7, "Dr. Who - Part 2")),
+    ("Some Movie.mp4", (0, "")),
+    ("Bonus - Making of.mp4", (0, "Making of")),
+])
+def test_parse_episode_filename(filename, expected) -> None:
+    assert _parse_episode_filename(filename) == expected
@@ -18,6 +18,8 @@ from language_guard import (
     normalize_variants,
     pick_best,
     sort_by_preference,
+    sort_by_preference_with_best,
+    best_by_preference,
     pick_best_with_quality,
     guess_audio_and_dub,
     _match_any
@@ -250,6 +252,45 @@ class TestVariantSelection:
         # Japanese should be last
         assert sorted_variants[3].audio_lang == "ja"
 
+    def test_sort_by_preference_with_best(self):
+        """Test that the single-pass helper returns the same order and its first entry as best."""
+        variants = [
+            EpisodeVariant(url="https://example.com/ja", source="test", audio_lang="ja"),
+            EpisodeVariant(url="https://example.com/de", source="test", audio_lang="de"),
+            EpisodeVariant(url="https://example.com/en", source="test", audio_lang="en")
+        ]
+
+        best, sorted_variants = sort_by_preference_with_best(variants)
+
+        assert sorted_variants == sort_by_preference(variants)
+        assert best is sorted_variants[0]
+        assert best.url == "https://example.com/de"
+
+    def test_sort_by_preference_with_best_no_match(self):
+        """Test that best is None when no variant matches a preference."""
+        variants = [
+            EpisodeVariant(url="https://example.com/fr", source="test", audio_lang="fr"),
+            EpisodeVariant(url="https://example.com/es", source="test", audio_lang="es")
+        ]
+
+        best, sorted_variants = sort_by_preference_with_best(variants)
+
+        assert best is None
+        assert [v.url for v in sorted_variants] == [v.url for v in variants]
+
+    def test_best_by_preference_matches_sorted_best(self):
+        """Test that the linear best-only pick agrees with the sorting helper."""
+        variants = [
+            EpisodeVariant(url="https://example.com/ja", source="test", audio_lang="ja"),
+            EpisodeVariant(url="https://example.com/en", source="test", audio_lang="en"),
+            EpisodeVariant(url="https://example.com/de", source="test", audio_lang="de")
+        ]
+
+        assert best_by_preference(variants) is sort_by_preference_with_best(variants)[0]
+        assert best_by_preference([
+            EpisodeVariant(url="https://example.com/fr", source="test", audio_lang="fr")
+        ]) is None
+
 class TestQualitySelection:
     """Test quality-based selection."""
 
@@ -287,6 +328,8 @@ class TestEdgeCases:
         """Test behavior with empty variant lists."""
         assert pick_best([]) is None
         assert sort_by_preference([]) == []
+        assert sort_by_preference_with_best([]) == (None, [])
+        assert best_by_preference([]) is None
         assert pick_best_with_quality([]) is None
 
     def test_mixed_quality_values(self):